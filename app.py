@@ -1,652 +1,556 @@
 # Import packages
-import numpy as np
-import pandas as pd
-import plotly.graph_objects as go
+import logging
+import math
+import threading
+
 import dash_mantine_components as dmc
 
-from dash import Dash, dcc, callback, Output, Input
-from graph_helpers import (
-    MANUAL_SHOT_LIMITS,
-    shot_type,
-    SHOT_COLOR,
-    HOVER_TEMPLATE,
-    CLUB_ORDER,
+from dash import (
+    Dash,
+    dcc,
+    callback,
+    clientside_callback,
+    ctx,
+    no_update,
+    ClientsideFunction,
+    Output,
+    Input,
+    State,
+    Patch,
+)
+from dash.exceptions import PreventUpdate
+from flask import abort, jsonify, request
+from cache import FigureCache
+from config import (
+    BAG_LABELS,
+    DATA_PATH,
+    DATA_REFRESH_INTERVAL,
+    DEFAULT_CLUB,
+    DEFERRED_LOAD,
+    FIGURE_CACHE_SIZE,
+    FIGURE_MAX_AGE,
+    LIMITS_PATH,
+    LOAD_PROCESSES,
+    METRICS_ENABLED,
+    RELOAD_INTERVAL,
+    RENDER_MODE,
+    SHARED_DIR,
+    SHOT_STORE,
+    WARMUP,
+    WARMUP_PROCESSES,
 )
+from datastore import DataStore, DataWatcher
+from metrics import instrument, timed
+from responses import cached_response
+from warmup import Warmer
 
+logger = logging.getLogger(__name__)
 
 # Incorporate data
-data = pd.read_excel(
-    "/workspaces/topyardage/data/Golf Range.xlsx", sheet_name=["PdH", "LG"]
-)
+# pandas and the modules built on it are imported where they are first
+# used, so the server can bind before the data is loaded
+WATCHED = [SHOT_STORE or DATA_PATH, *([LIMITS_PATH] if LIMITS_PATH else [])]
 
-# Initialize the app
-app = Dash(
-    __name__,
-    external_stylesheets=[
-        # include google fonts
-        "https://fonts.googleapis.com/css2?family=Inter:wght@100;200;300;400;500;900&display=swap"
-    ],
-)
 
-# App layout
-app.layout = dmc.MantineProvider(
-    withGlobalStyles=True,
-    theme={"colors": dmc.theme.DEFAULT_COLORS["green"]},
-    children=[
-        dmc.Stack(
-            [
-                dmc.Header(
-                    height=70,
-                    fixed=True,
-                    px=25,
-                    pt=12,
-                    children=[
-                        dmc.Text(
-                            "Pablo's Yardage Book",
-                            size="xl",
-                            color=dmc.theme.DEFAULT_COLORS["green"][8],
-                            align="left",
-                        )
-                    ],
-                ),
-                dmc.Space(h=70),
-                dmc.RadioGroup(
-                    [
-                        dmc.Radio("Puerta de Hierro", "PdH"),
-                        dmc.Radio("La Granja", "LG"),
-                    ],
-                    id="golf-bag",
-                    value="PdH",
-                    label="Select Golf Bag",
-                ),
-                dmc.Center(
-                    style={"width": "100%"},
-                    children=[dcc.Graph(figure={}, id="shot-tracer")],
-                ),
-            ],
-            spacing="xl",
-        )
-    ],
-)
+def shot_limits():
+    """Shared limits, and the limits of the bags with their own."""
+    from graph_helpers import MANUAL_SHOT_LIMITS
+    from limits import load_bag_limits, load_limits
 
+    if not LIMITS_PATH:
+        return MANUAL_SHOT_LIMITS, {}
+    return load_limits(LIMITS_PATH), load_bag_limits(LIMITS_PATH)
 
-def basic_shapes(fig):
-    fig.add_shape(
-        type="circle",
-        xref="x",
-        yref="y",
-        x0=15,
-        y0=15,
-        x1=-15,
-        y1=-15,
-        line_color="#55A868",
-        fillcolor="#55A868",
-        layer="below",
-    )
 
-    fig.add_shape(
-        type="line",
-        x0=15,
-        x1=-15,
-        y0=0,
-        y1=0,
-        line={"dash": "dot"},
-    )
+def read_snapshot(shot_limit, bag_limits, previous=None):
+    from dataset import build_snapshot, build_store_snapshot
+    from ingest import load_bags
+    from shot_store import ShotStore
+
+    with timed("load"):
+        if SHOT_STORE:
+            return build_store_snapshot(
+                ShotStore(SHOT_STORE), shot_limit, previous, bag_limits
+            )
+        data = load_bags(DATA_PATH, LOAD_PROCESSES)
+    return build_snapshot(data, shot_limit, previous, bag_limits)
 
-    fig.add_shape(
-        type="rect",
-        x0=15,
-        y0=-18,
-        x1=-15,
-        y1=-23,
-        line={"color": SHOT_COLOR["Miss Hit"]},
-    )
 
-    fig.add_trace(
-        go.Scatter(
-            x=[0],
-            y=[0],
-            mode="markers",
-            marker={"color": "red"},
-            hoverinfo="skip",
-            showlegend=False,
+def load_snapshot(previous=None):
+    shot_limit, bag_limits = shot_limits()
+    if SHARED_DIR:
+        from shared import SharedData, load_shared
+
+        return load_shared(
+            SharedData(SHARED_DIR),
+            WATCHED,
+            shot_limit,
+            lambda: read_snapshot(shot_limit, bag_limits, previous),
+            bag_limits,
         )
-    )
+    return read_snapshot(shot_limit, bag_limits, previous)
 
-    return fig
 
+DATA = DataStore()
+FIGURE_CACHE = FigureCache(maxsize=FIGURE_CACHE_SIZE)
+# Encoded bodies of /figure, by the same keys as FIGURE_CACHE
+RESPONSE_CACHE = FigureCache(maxsize=FIGURE_CACHE_SIZE)
+# ClubIndex of each bag for /api/recommend, by the bag's figure_key
+INDEX_CACHE = FigureCache(maxsize=FIGURE_CACHE_SIZE)
 
-def good_shots(fig, shots):
-    club_name = shots["Club"].unique()[0]
-    try:
-        good = shots.groupby("Shot").get_group("Good")
-    except KeyError:
-        return fig, 0
-
-    median_carry = good["Flat Carry"].median()
-    fig.add_trace(
-        go.Scatter(
-            x=[-18],
-            y=[0],
-            mode="text",
-            text=[f"{median_carry:.0f}m"],
-            visible=club_name == 8,
-            hoverinfo="skip",
-            showlegend=False,
-        )
-    )
 
-    median_offline = good["Offline"].median()
-    fig.add_trace(
-        go.Scatter(
-            x=[median_offline, median_offline],
-            y=[-15, 15],
-            mode="lines",
-            visible=club_name == 8,
-            hoverinfo="skip",
-            showlegend=False,
-            line={
-                "dash": "dot",
-                "color": fig._layout["template"]["layout"]["shapedefaults"]["line"][
-                    "color"
-                ],
-            },
-        )
-    )
+def figure_key(snapshot, golf_bag, club_name=None):
+    if club_name is None:
+        return (golf_bag, *snapshot.versions(golf_bag))
+    return (golf_bag, club_name, *snapshot.versions(golf_bag, club_name))
 
-    fig.add_trace(
-        go.Scatter(
-            x=[median_offline],
-            y=[16],
-            mode="text",
-            text=[f"{median_offline:.0f}m"],
-            visible=club_name == 8,
-            hoverinfo="skip",
-            showlegend=False,
-        )
-    )
 
-    good_roll = good["Roll"].mean()
-    fig.add_trace(
-        go.Scatter(
-            x=[0, 0],
-            y=[0, min(good_roll, 15)],
-            mode="lines",
-            line={"color": "red"},
-            visible=club_name == 8,
-            hoverinfo="text",
-            text=f"Roll: {good_roll:.0f}m",
-            showlegend=False,
-        )
-    )
+def evict_stale(previous, snapshot):
+    """Drop the cached figures whose data or club limits changed."""
 
-    fig.add_trace(
-        go.Scatter(
-            x=good["Offline"].to_list(),
-            y=(good["Flat Carry"] - median_carry).to_list(),
-            mode="markers",
-            marker={"color": SHOT_COLOR["Good"]},
-            name="",
-            showlegend=False,
-            hovertemplate=HOVER_TEMPLATE,
-            customdata=np.stack((good["Total Distance"], good["Flat Carry"]), axis=1),
-            visible=club_name == 8,
+    def stale(key):
+        if key[0] == "store":
+            return key[1] != snapshot.version
+        golf_bag, club_name = key[0], key[1] if len(key) == 4 else None
+        return golf_bag not in snapshot.bags or key != figure_key(
+            snapshot, golf_bag, club_name
         )
-    )
 
-    return fig, 5
+    FIGURE_CACHE.invalidate(stale)
+    RESPONSE_CACHE.invalidate(stale)
+    INDEX_CACHE.invalidate(stale)
 
 
-def soft_shots(fig, shots):
-    club_name = shots["Club"].unique()[0]
-    try:
-        soft = shots.groupby("Shot").get_group("Soft")
-        try:
-            good = shots.groupby("Shot").get_group("Good")
-        except KeyError:
-            good = shots.groupby("Shot").get_group("Soft")
-    except KeyError:
-        return fig, 0
-
-    median_carry = soft["Flat Carry"].median()
-    fig.add_trace(
-        go.Scatter(
-            x=[-15, 15],
-            y=[
-                median_carry - good["Flat Carry"].median(),
-                median_carry - good["Flat Carry"].median(),
-            ],
-            mode="lines",
-            visible=club_name == 8,
-            hoverinfo="skip",
-            showlegend=False,
-            line={"dash": "dot", "color": SHOT_COLOR["Soft"]},
-        )
-    )
+DATA.subscribe(evict_stale)
 
-    fig.add_trace(
-        go.Scatter(
-            x=[-18],
-            y=[median_carry - good["Flat Carry"].median()],
-            mode="text",
-            text=[f"{median_carry:.0f}m"],
-            visible=club_name == 8,
-            hoverinfo="skip",
-            showlegend=False,
-        )
-    )
 
-    return fig, 2
+def bag_builder():
+    from figures import build_bag_figure, build_consolidated_figure
 
+    if RENDER_MODE == "consolidated":
+        return build_consolidated_figure
+    return build_bag_figure
 
-def bad_bar(fig, shots):
-    club_name = shots["Club"].unique()[0]
-    shot_pct = shots["Shot"].value_counts(normalize=True)
-    total_len = 30
-    num = 0
 
-    try:
-        miss_pct = shot_pct["Miss Hit"]
-    except KeyError:
-        miss_len = 0
-    else:
-        miss_len = miss_pct * total_len
-        fig.add_trace(
-            go.Scatter(
-                x=[-15, miss_len - 15, miss_len - 15, -15],
-                y=[-23, -23, -18, -18],
-                fill="toself",
-                mode="none",
-                fillcolor=SHOT_COLOR["Miss Hit"],
-                hoveron="fills",
-                text=f"<b>Miss Hits</b> ({miss_pct:.0%})",
-                hoverinfo="text",
-                visible=club_name == 8,
-                showlegend=False,
-            )
-        )
-        num += 1
+def warmup_tasks(snapshot):
+    """What the callbacks of RENDER_MODE would put in the cache."""
+    from figures import build_club_figure, club_payload, split_clubs
 
-    try:
-        flat_pct = shot_pct["Flat"]
-    except KeyError:
-        flat_len = 0
-    else:
-        flat_len = flat_pct * total_len
-        fig.add_trace(
-            go.Scatter(
-                x=[
-                    miss_len - 15,
-                    flat_len + miss_len - 15,
-                    flat_len + miss_len - 15,
-                    miss_len - 15,
-                ],
-                y=[-23, -23, -18, -18],
-                fill="toself",
-                mode="none",
-                fillcolor=SHOT_COLOR["Flat"],
-                hoveron="fills",
-                text=f"<b>Flat</b> ({flat_pct:.0%})",
-                hoverinfo="text",
-                visible=club_name == 8,
-                showlegend=False,
+    if RENDER_MODE == "client":
+        return [(("store", snapshot.version), club_payload, (dict(snapshot.bags),))]
+    if RENDER_MODE == "club":
+        # Only the club's own data is pickled to the pool, not the whole bag
+        return [
+            (
+                figure_key(snapshot, golf_bag, club_name),
+                build_club_figure,
+                (club, club_name),
             )
-        )
-        num += 1
+            for golf_bag, bag in snapshot.bags.items()
+            for club_name, club in split_clubs(bag).items()
+        ]
+    build = bag_builder()
+    return [
+        (figure_key(snapshot, golf_bag), build, (bag,))
+        for golf_bag, bag in snapshot.bags.items()
+    ]
 
-    return fig, num
 
+WARMER = None
+if WARMUP:
+    WARMER = Warmer(FIGURE_CACHE, warmup_tasks, WARMUP_PROCESSES)
+    DATA.subscribe(lambda previous, snapshot: WARMER.start(snapshot))
 
-def good_bar(fig, shots):
-    club_name = shots["Club"].unique()[0]
-    shot_pct = shots["Shot"].value_counts(normalize=True)
-    total_len = 30
-    num = 0
 
+def start_data():
+    """Load the first snapshot, then keep reloading it as the data changes."""
     try:
-        good_pct = shot_pct["Good"]
-    except KeyError:
-        good_pct = 0
+        DATA.publish(load_snapshot())
+    finally:
+        if RELOAD_INTERVAL > 0:
+            DataWatcher(
+                DATA, WATCHED, lambda: load_snapshot(DATA.current()), RELOAD_INTERVAL
+            ).start()
 
-    try:
-        soft_pct = shot_pct["Soft"]
-    except KeyError:
-        soft_pct = 0
-
-    good_soft_len = (good_pct + soft_pct) * total_len / 2
-
-    if good_soft_len > 0:
-        fig.add_trace(
-            go.Scatter(
-                x=[
-                    good_soft_len * -1,
-                    good_soft_len,
-                    good_soft_len,
-                    good_soft_len * -1,
-                ],
-                y=[23, 23, 18, 18],
-                fill="toself",
-                mode="none",
-                fillcolor=SHOT_COLOR["Good"],
-                hoveron="fills",
-                text=f"<b>Good</b> ({good_pct:.0%})<br><b>Soft</b> ({soft_pct:.0%})",
-                hoverinfo="text",
-                visible=club_name == 8,
-                showlegend=False,
-            )
-        )
-        num += 1
 
+def start_data_deferred():
     try:
-        fade_pct = shot_pct["Fade"]
-    except KeyError:
-        pass
-    else:
-        fade_carry = shots.groupby("Shot").get_group("Fade")["Flat Carry"].median()
-        fade_offline = shots.groupby("Shot").get_group("Fade")["Offline"].mean()
-
-        fade_len = fade_pct * total_len
-        fig.add_trace(
-            go.Scatter(
-                x=[
-                    good_soft_len,
-                    good_soft_len + fade_len,
-                    good_soft_len + fade_len,
-                    good_soft_len,
-                ],
-                y=[23, 23, 18, 18],
-                fill="toself",
-                mode="none",
-                fillcolor=SHOT_COLOR["Fade"],
-                hoveron="fills",
-                text=f"<b>Fade</b> ({fade_pct:.0%})<br>Flat Carry: {fade_carry:.0f}m<br>Offline: {fade_offline:.0f}m",
-                hoverinfo="text",
-                visible=club_name == 8,
-                showlegend=False,
-            )
-        )
-        num += 1
+        start_data()
+    except Exception:
+        # The watcher retries once the data changes
+        logger.exception("Loading the data failed")
+
+
+if DEFERRED_LOAD:
+    threading.Thread(
+        target=start_data_deferred, name="topyardage-data-loader", daemon=True
+    ).start()
+else:
+    start_data()
+
+# Shown in place of the graph until the data is loaded
+PLACEHOLDER = {
+    "data": [],
+    "layout": {
+        "title": {"text": "Loading shots…"},
+        "xaxis": {"visible": False},
+        "yaxis": {"visible": False},
+        "width": 1000,
+        "height": 1000,
+    },
+}
 
-    try:
-        draw_pct = shot_pct["Draw"]
-    except KeyError:
-        pass
-    else:
-        draw_carry = shots.groupby("Shot").get_group("Draw")["Flat Carry"].median()
-        draw_offline = shots.groupby("Shot").get_group("Draw")["Offline"].mean()
-
-        draw_len = draw_pct * total_len
-        fig.add_trace(
-            go.Scatter(
-                x=[
-                    -good_soft_len,
-                    -good_soft_len - draw_len,
-                    -good_soft_len - draw_len,
-                    -good_soft_len,
-                ],
-                y=[23, 23, 18, 18],
-                fill="toself",
-                mode="none",
-                fillcolor=SHOT_COLOR["Draw"],
-                hoveron="fills",
-                text=f"<b>Draw</b> ({draw_pct:.0%})<br>Flat Carry: {draw_carry:.0f}m<br>Offline: {draw_offline:.0f}m",
-                hoverinfo="text",
-                visible=club_name == 8,
-                showlegend=False,
-            )
-        )
-        num += 1
+# Initialize the app
+app = Dash(
+    __name__,
+    external_stylesheets=[
+        # include google fonts
+        "https://fonts.googleapis.com/css2?family=Inter:wght@100;200;300;400;500;900&display=swap"
+    ],
+)
+server = app.server
 
-    return fig, num
 
+def bag_label(golf_bag):
+    workbook, _, sheet = golf_bag.rpartition("/")
+    label = BAG_LABELS.get(sheet, sheet)
+    return f"{workbook}: {label}" if workbook else label
 
-def slice_bar(fig, shots):
-    club_name = shots["Club"].unique()[0]
-    shot_pct = shots["Shot"].value_counts(normalize=True)
-    total_len = 30
-    num = 0
 
-    try:
-        push_pct = shot_pct["Push"]
-    except KeyError:
-        push_len = 0
-    else:
-        push_len = push_pct * total_len
-        fig.add_trace(
-            go.Scatter(
-                x=[23, 23, 18, 18],
-                y=[-15, push_len - 15, push_len - 15, -15],
-                fill="toself",
-                mode="none",
-                fillcolor=SHOT_COLOR["Push"],
-                hoveron="fills",
-                text=f"<b>Push</b> ({push_pct:.0%})",
-                hoverinfo="text",
-                visible=club_name == 8,
-                showlegend=False,
-            )
-        )
-        num += 1
+def default_bag(bags):
+    if not bags:
+        return None
+    return "PdH" if "PdH" in bags else bags[0]
 
-    try:
-        slice_pct = shot_pct["Slice"]
-    except KeyError:
-        slice_len = 0
-    else:
-        slice_len = slice_pct * total_len
-        fig.add_trace(
-            go.Scatter(
-                x=[23, 23, 18, 18],
-                y=[
-                    push_len - 15,
-                    slice_len + push_len - 15,
-                    slice_len + push_len - 15,
-                    push_len - 15,
-                ],
-                fill="toself",
-                mode="none",
-                fillcolor=SHOT_COLOR["Slice"],
-                hoveron="fills",
-                text=f"<b>Slice</b> ({slice_pct:.0%})",
-                hoverinfo="text",
-                visible=club_name == 8,
-                showlegend=False,
-            )
-        )
-        num += 1
 
-    try:
-        slice_push_pct = shot_pct["Slice/Push"]
-    except KeyError:
-        slice_push_len = 0
-    else:
-        slice_push_len = slice_push_pct * total_len
-        fig.add_trace(
-            go.Scatter(
-                x=[23, 23, 18, 18],
-                y=[
-                    slice_len + push_len - 15,
-                    slice_push_len + slice_len + push_len - 15,
-                    slice_push_len + slice_len + push_len - 15,
-                    slice_len + push_len - 15,
+def bag_radios(bags):
+    return [dmc.Radio(bag_label(golf_bag), golf_bag) for golf_bag in bags]
+
+
+# App layout
+def serve_layout():
+    snapshot = DATA.current()
+    bags = list(snapshot.bags) if snapshot is not None else []
+    return dmc.MantineProvider(
+        withGlobalStyles=True,
+        theme={"colors": dmc.theme.DEFAULT_COLORS["green"]},
+        children=[
+            dmc.Stack(
+                [
+                    dmc.Header(
+                        height=70,
+                        fixed=True,
+                        px=25,
+                        pt=12,
+                        children=[
+                            dmc.Text(
+                                "Pablo's Yardage Book",
+                                size="xl",
+                                color=dmc.theme.DEFAULT_COLORS["green"][8],
+                                align="left",
+                            )
+                        ],
+                    ),
+                    dmc.Space(h=70),
+                    dmc.RadioGroup(
+                        bag_radios(bags),
+                        id="golf-bag",
+                        value=default_bag(bags),
+                        label="Select Golf Bag",
+                    ),
+                    *(
+                        [
+                            dmc.SegmentedControl(
+                                id="club", data=[], value=str(DEFAULT_CLUB)
+                            )
+                        ]
+                        if RENDER_MODE in ("club", "client")
+                        else []
+                    ),
+                    *(
+                        [
+                            dcc.Store(id="shot-data"),
+                            dcc.Store(id="shot-data-version"),
+                            dcc.Interval(
+                                id="data-refresh", interval=DATA_REFRESH_INTERVAL * 1000
+                            ),
+                        ]
+                        if RENDER_MODE == "client"
+                        else []
+                    ),
+                    *(
+                        [
+                            dcc.Interval(
+                                id="data-ready",
+                                interval=500,
+                                disabled=snapshot is not None,
+                            )
+                        ]
+                        if DEFERRED_LOAD
+                        else []
+                    ),
+                    dmc.Center(
+                        style={"width": "100%"},
+                        children=[dcc.Graph(figure=PLACEHOLDER, id="shot-tracer")],
+                    ),
                 ],
-                fill="toself",
-                mode="none",
-                fillcolor=SHOT_COLOR["Slice/Push"],
-                hoveron="fills",
-                text=f"<b>Slice/Push</b> ({slice_push_pct:.0%})",
-                hoverinfo="text",
-                visible=club_name == 8,
-                showlegend=False,
+                spacing="xl",
             )
-        )
-        num += 1
+        ],
+    )
 
-    return fig, num
 
+app.layout = serve_layout
 
-def hook_bar(fig, shots):
-    club_name = shots["Club"].unique()[0]
-    shot_pct = shots["Shot"].value_counts(normalize=True)
-    total_len = 30
-    num = 0
 
-    try:
-        pull_pct = shot_pct["Pull"]
-    except KeyError:
-        pull_len = 0
-    else:
-        pull_len = pull_pct * total_len
-        fig.add_trace(
-            go.Scatter(
-                x=[-23, -23, -18, -18],
-                y=[-15, pull_len - 15, pull_len - 15, -15],
-                fill="toself",
-                mode="none",
-                fillcolor=SHOT_COLOR["Pull"],
-                hoveron="fills",
-                text=f"<b>Pull</b> ({pull_pct:.0%})",
-                hoverinfo="text",
-                visible=club_name == 8,
-                showlegend=False,
-            )
-        )
-        num += 1
+def cache_gauges():
+    return {
+        "topyardage_figure_cache_size": (
+            "Entries in the figure cache.",
+            FIGURE_CACHE.stats()["size"],
+        ),
+    }
 
-    try:
-        hook_pct = shot_pct["Hook"]
-    except KeyError:
-        hook_len = 0
-    else:
-        hook_len = hook_pct * total_len
-        fig.add_trace(
-            go.Scatter(
-                x=[-23, -23, -18, -18],
-                y=[
-                    pull_len - 15,
-                    hook_len + pull_len - 15,
-                    hook_len + pull_len - 15,
-                    pull_len - 15,
-                ],
-                fill="toself",
-                mode="none",
-                fillcolor=SHOT_COLOR["Hook"],
-                hoveron="fills",
-                text=f"<b>Hook</b> ({hook_pct:.0%})",
-                hoverinfo="text",
-                visible=club_name == 8,
-                showlegend=False,
-            )
-        )
-        num += 1
 
-    try:
-        hook_pull_pct = shot_pct["Hook/Pull"]
-    except KeyError:
-        hook_pull_len = 0
-    else:
-        hook_pull_len = hook_pull_pct * total_len
-        fig.add_trace(
-            go.Scatter(
-                x=[-23, -23, -18, -18],
-                y=[
-                    hook_len + pull_len - 15,
-                    hook_pull_len + hook_len + pull_len - 15,
-                    hook_pull_len + hook_len + pull_len - 15,
-                    hook_len + pull_len - 15,
-                ],
-                fill="toself",
-                mode="none",
-                fillcolor=SHOT_COLOR["Hook/Pull"],
-                hoveron="fills",
-                text=f"<b>Hook/Pull</b> ({hook_pull_pct:.0%})",
-                hoverinfo="text",
-                visible=club_name == 8,
-                showlegend=False,
-            )
-        )
-        num += 1
+def cache_counters():
+    stats = FIGURE_CACHE.stats()
+    return {
+        "topyardage_figure_cache_hits_total": ("Figure cache hits.", stats["hits"]),
+        "topyardage_figure_cache_misses_total": (
+            "Figure cache misses.",
+            stats["misses"],
+        ),
+    }
 
-    return fig, num
+
+if METRICS_ENABLED:
+    instrument(app.server, cache_gauges, cache_counters)
+
+
+@server.route("/ready")
+def ready():
+    """200 once the data is loaded and its figures warmed up, 503 before."""
+    snapshot = DATA.current()
+    is_ready = snapshot is not None and (WARMER is None or WARMER.ready.is_set())
+    return jsonify(ready=is_ready, version=snapshot and snapshot.version), (
+        200 if is_ready else 503
+    )
+
+
+@server.route("/figure/<path:golf_bag>")
+def figure(golf_bag):
+    """JSON of a bag's figure, or of one club's with ?club=, for HTTP caches."""
+    from figures import build_club_figure, encode_figure
+
+    snapshot = DATA.current()
+    if snapshot is None:
+        return jsonify(ready=False), 503, {"Retry-After": "1"}
+    if golf_bag not in snapshot.bags:
+        abort(404)
+    bag = snapshot.bags[golf_bag]
+
+    club = request.args.get("club")
+    club_name = None if club is None else bag_club(bag, club)
+    if club is not None and club_name is None:
+        abort(404)
+    key = figure_key(snapshot, golf_bag, club_name)
+
+    def build():
+        if club_name is None:
+            return bag_builder()(bag)
+        return build_club_figure(bag, club_name)
+
+    return cached_response(
+        key,
+        lambda: encode_figure(FIGURE_CACHE.get_or_build(key, build)),
+        RESPONSE_CACHE,
+        FIGURE_MAX_AGE,
+    )
+
+
+@server.route("/api/recommend")
+def recommend_clubs():
+    """Club for each ?target= metres of ?bag=, with ?tolerance= and ?metric=."""
+    from recommend import DEFAULT_TOLERANCE, METRICS, ClubIndex
+
+    snapshot = DATA.current()
+    if snapshot is None:
+        return jsonify(ready=False), 503, {"Retry-After": "1"}
+    golf_bag = request.args.get("bag", default_bag(list(snapshot.bags)))
+    if golf_bag not in snapshot.bags:
+        abort(404)
+
+    targets = request.args.getlist("target", type=float)
+    tolerance = request.args.get("tolerance", DEFAULT_TOLERANCE, type=float)
+    metric = request.args.get("metric", "carry")
+    if not targets or metric not in METRICS:
+        return jsonify(error="target and a metric of carry or total needed"), 400
+    # NaN and infinities are not JSON, a tolerance of 0 or less no window
+    if not all(map(math.isfinite, [*targets, tolerance])) or tolerance <= 0:
+        return jsonify(error="finite targets and a positive tolerance needed"), 400
+
+    bag = snapshot.bags[golf_bag]
+    index = INDEX_CACHE.get_or_build(
+        figure_key(snapshot, golf_bag), lambda: ClubIndex.from_bag(bag)
+    )
+    try:
+        recommendations = index.recommend(targets, tolerance, metric)
+    except ValueError as error:
+        # No club of the bag has a shot to go by
+        return jsonify(error=str(error)), 404
+    return jsonify(
+        bag=golf_bag,
+        metric=metric,
+        tolerance=tolerance,
+        recommendations=[
+            {
+                "target": row.Target,
+                "club": str(row.Club),
+                "probability": row.Probability,
+                "median": row.Median,
+            }
+            for row in recommendations.itertuples()
+        ],
+    )
 
 
 # Add controls to build the interaction
-@callback(
-    Output(component_id="shot-tracer", component_property="figure"),
-    Input(component_id="golf-bag", component_property="value"),
-)
+def current_bag(golf_bag):
+    snapshot = DATA.current()
+    if snapshot is None or golf_bag not in snapshot.bags:
+        # Bag removed from the data since the page was loaded
+        raise PreventUpdate
+    return snapshot, snapshot.bags[golf_bag]
+
+
+def update_bags(n_intervals):
+    """Fill in the bags once the deferred load is done."""
+    snapshot = DATA.current()
+    if snapshot is None:
+        raise PreventUpdate
+    bags = list(snapshot.bags)
+    return bag_radios(bags), default_bag(bags), True
+
+
 def update_graph(golf_bag):
-    df = data[golf_bag]
-    df["Offset"] = df["Offline"] - df["Curve"]
-    df["Roll"] = df["Total Distance"] - df["Flat Carry"]
-    df["Shot"] = df.apply(lambda x: shot_type(x, MANUAL_SHOT_LIMITS), axis=1)
+    if DATA.current() is None:
+        return PLACEHOLDER
+    snapshot, bag = current_bag(golf_bag)
+    with timed("callback"):
+        return FIGURE_CACHE.get_or_build(
+            figure_key(snapshot, golf_bag), lambda: bag_builder()(bag)
+        )
 
-    club_trace = []
-    clubs = df.groupby("Club")
 
-    fig = go.Figure()
+def update_clubs(golf_bag, club):
+    _, bag = current_bag(golf_bag)
+    clubs = [str(club_name) for club_name in bag.clubs]
+    if club not in clubs:
+        club = str(DEFAULT_CLUB) if str(DEFAULT_CLUB) in clubs else clubs[0]
+    return clubs, club
 
-    fig = basic_shapes(fig)
 
-    for club_name, club_data in clubs:
-        fig, num = good_shots(fig, club_data)
-        club_trace = club_trace + [club_name] * num
+def update_club_graph(golf_bag, club):
+    if DATA.current() is None:
+        return PLACEHOLDER
+    with timed("callback"):
+        return club_graph(golf_bag, club)
 
-        fig, num = soft_shots(fig, club_data)
-        club_trace = club_trace + [club_name] * num
 
-        fig, num = bad_bar(fig, club_data)
-        club_trace = club_trace + [club_name] * num
+def bag_club(bag, club):
+    """Club of bag whose value in the club control is club, None if missing."""
+    return {str(club_name): club_name for club_name in bag.clubs}.get(club)
 
-        fig, num = good_bar(fig, club_data)
-        club_trace = club_trace + [club_name] * num
 
-        fig, num = slice_bar(fig, club_data)
-        club_trace = club_trace + [club_name] * num
+def club_graph(golf_bag, club):
+    from figures import build_club_figure, trace_json
 
-        fig, num = hook_bar(fig, club_data)
-        club_trace = club_trace + [club_name] * num
+    snapshot, bag = current_bag(golf_bag)
+    club_name = bag_club(bag, club)
+    if club_name is None:
+        # New bag without this club, update_clubs picks another one
+        return no_update
 
-    fig.update_layout(
-        updatemenus=[
-            {
-                "active": 7,
-                "buttons": list(
-                    [
-                        {
-                            "label": club,
-                            "args": [
-                                {
-                                    "visible": [True]
-                                    + [club_name == club for club_name in club_trace]
-                                },
-                                {"title": club, "showlegend": True},
-                            ],
-                        }
-                        for club in [
-                            club for club in CLUB_ORDER if club in clubs.groups.keys()
-                        ]
-                    ]
-                ),
-                "pad": {"r": 10, "t": 10},
-                "showactive": True,
-                "x": 0,
-                "xanchor": "left",
-                "y": 1.05,
-                "yanchor": "top",
-            }
-        ]
+    fig = FIGURE_CACHE.get_or_build(
+        figure_key(snapshot, golf_bag, club_name),
+        lambda: build_club_figure(bag, club_name),
     )
+    if set(ctx.triggered_prop_ids) != {"club.value"}:
+        return fig
+
+    # Same bag, the shapes and axes in the browser are still valid
+    patched = Patch()
+    patched["data"] = [trace_json(trace) for trace in fig.data]
+    patched["layout"]["title"]["text"] = str(club_name)
+    return patched
+
+
+def refresh_store(n_intervals, version, data_ready=None):
+    from figures import club_payload
 
-    fig.update_layout(
-        xaxis={"range": [-30, 30], "visible": False, "showticklabels": False},
-        yaxis={"range": [-30, 30], "visible": False, "showticklabels": False},
-        width=1000,
-        height=1000,
-        title="Approach",
-        plot_bgcolor="#FFFFFF",
+    snapshot = DATA.current()
+    if snapshot is None or version == snapshot.version:
+        return no_update, no_update
+
+    payload = FIGURE_CACHE.get_or_build(
+        ("store", snapshot.version), lambda: club_payload(snapshot.bags)
+    )
+    return payload, snapshot.version
+
+
+if DEFERRED_LOAD:
+    callback(
+        Output(component_id="golf-bag", component_property="children"),
+        Output(component_id="golf-bag", component_property="value"),
+        Output(component_id="data-ready", component_property="disabled"),
+        Input(component_id="data-ready", component_property="n_intervals"),
+        prevent_initial_call=True,
+    )(update_bags)
+
+if RENDER_MODE == "client":
+    callback(
+        Output(component_id="shot-data", component_property="data"),
+        Output(component_id="shot-data-version", component_property="data"),
+        Input(component_id="data-refresh", component_property="n_intervals"),
+        State(component_id="shot-data-version", component_property="data"),
+        *(
+            [Input(component_id="data-ready", component_property="n_intervals")]
+            if DEFERRED_LOAD
+            else []
+        ),
+    )(refresh_store)
+    clientside_callback(
+        ClientsideFunction(namespace="topyardage", function_name="update_clubs"),
+        Output(component_id="club", component_property="data"),
+        Output(component_id="club", component_property="value"),
+        Input(component_id="golf-bag", component_property="value"),
+        Input(component_id="shot-data", component_property="data"),
+        State(component_id="club", component_property="value"),
+    )
+    clientside_callback(
+        ClientsideFunction(namespace="topyardage", function_name="update_graph"),
+        Output(component_id="shot-tracer", component_property="figure"),
+        Input(component_id="golf-bag", component_property="value"),
+        Input(component_id="club", component_property="value"),
+        Input(component_id="shot-data", component_property="data"),
     )
-    return fig
+elif RENDER_MODE == "club":
+    callback(
+        Output(component_id="club", component_property="data"),
+        Output(component_id="club", component_property="value"),
+        Input(component_id="golf-bag", component_property="value"),
+        State(component_id="club", component_property="value"),
+    )(update_clubs)
+    callback(
+        Output(component_id="shot-tracer", component_property="figure"),
+        Input(component_id="golf-bag", component_property="value"),
+        Input(component_id="club", component_property="value"),
+    )(update_club_graph)
+else:
+    callback(
+        Output(component_id="shot-tracer", component_property="figure"),
+        Input(component_id="golf-bag", component_property="value"),
+    )(update_graph)
 
 
 # Run the app
@@ -0,0 +1,27 @@
+// Clientside callbacks of the "client" render mode, fed by the shot-data store
+window.dash_clientside = Object.assign({}, window.dash_clientside, {
+    topyardage: {
+        update_clubs: function (golfBag, store, club) {
+            const bag = store && store.bags[golfBag];
+            if (!bag) {
+                return [window.dash_clientside.no_update, window.dash_clientside.no_update];
+            }
+            if (!bag.clubs.includes(club)) {
+                club = bag.clubs.includes(store.default_club) ? store.default_club : bag.clubs[0];
+            }
+            return [bag.clubs, club];
+        },
+
+        update_graph: function (golfBag, club, store) {
+            const bag = store && store.bags[golfBag];
+            if (!bag || !(club in bag.traces)) {
+                return window.dash_clientside.no_update;
+            }
+            const figure = store.figure;
+            return {
+                data: figure.data.concat(bag.traces[club]),
+                layout: Object.assign({}, figure.layout, {title: {text: club}}),
+            };
+        },
+    },
+});
@@ -0,0 +1,138 @@
+"""Time parsing a workbook with and without column projection, per engine.
+
+python -m benchmarks.bench_excel --shots 100000
+"""
+
+import argparse
+import json
+import platform
+import statistics
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.synthetic import synthetic_shots
+from config import DATA_PATH
+from ingest import HAS_CALAMINE, read_workbook
+
+# Columns of a Topgolf export, in the bundled workbook's order
+WORKBOOK_COLUMNS = [
+    "Club",
+    "Make",
+    "Date",
+    "Range",
+    "Temperature",
+    "Wind Direction",
+    "Wind Speed",
+    "Flat Carry",
+    "Total Distance",
+    "Ball Speed",
+    "Launch Angle",
+    "Height",
+    "Landing Angle",
+    "Hang Time",
+    "Curve",
+    "Offline",
+]
+
+
+def synthetic_workbook(path, n, sheets=2):
+    """Workbook of sheets with n shots each, including the unused columns."""
+    with pd.ExcelWriter(path, engine="openpyxl") as writer:
+        for seed in range(sheets):
+            shots = synthetic_shots(n, seed=seed)
+            rng = np.random.default_rng(seed)
+            shots = shots.assign(
+                Make="Cobra LTDx",
+                Date=pd.Timestamp("2022-06-27")
+                + pd.to_timedelta(rng.integers(0, 365, n), unit="D"),
+                Range="FDM",
+                Temperature=rng.integers(5, 35, n),
+                **{
+                    "Wind Direction": rng.choice(["N", "E", "S", "W"], n),
+                    "Wind Speed": rng.integers(0, 20, n),
+                    "Landing Angle": rng.integers(10, 50, n),
+                    "Hang Time": rng.integers(30, 70, n),
+                },
+            )
+            shots[WORKBOOK_COLUMNS].to_excel(
+                writer, sheet_name=f"Bag{seed}", index=False
+            )
+
+
+def current(path):
+    return pd.read_excel(path, sheet_name=None)
+
+
+def readers():
+    yield "read_excel", current
+    yield "projected_openpyxl", lambda path: read_workbook(path, engine="openpyxl")
+    if HAS_CALAMINE:
+        yield "projected_calamine", lambda path: read_workbook(path, engine="calamine")
+
+
+def bench_workbook(name, path, runs):
+    results = []
+    for reader, read in readers():
+        seconds = []
+        for _ in range(runs):
+            start = time.perf_counter()
+            sheets = read(path)
+            seconds.append(time.perf_counter() - start)
+        results.append(
+            {
+                "workbook": name,
+                "reader": reader,
+                "shots": sum(len(df) for df in sheets.values()),
+                "columns": max(len(df.columns) for df in sheets.values()),
+                "median_seconds": statistics.median(seconds),
+                "min_seconds": min(seconds),
+                "runs": seconds,
+            }
+        )
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--shots", type=int, default=100_000, help="shots per synthetic sheet"
+    )
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--output", default="benchmarks/excel_results.json")
+    args = parser.parse_args(argv)
+
+    results = []
+    with tempfile.TemporaryDirectory() as workdir:
+        workbooks = {}
+        if DATA_PATH.is_file():
+            workbooks["bundled"] = DATA_PATH
+        workbooks["synthetic"] = Path(workdir) / "synthetic.xlsx"
+        synthetic_workbook(workbooks["synthetic"], args.shots)
+
+        for name, path in workbooks.items():
+            for row in bench_workbook(name, path, args.runs):
+                print(
+                    f"{row['workbook']:<10} {row['shots']:>8} {row['reader']:<20}"
+                    f" {row['median_seconds']:.4f}s"
+                )
+                results.append(row)
+
+    report = {
+        "created": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "pandas": pd.__version__,
+        "results": results,
+    }
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+"""Memory of the prepared shots, as loaded and compacted.
+
+python -m benchmarks.bench_memory --sizes 100000 1000000
+"""
+
+import argparse
+
+from benchmarks.synthetic import synthetic_shots
+from config import DATA_PATH
+from dataset import compact
+from figures import derive_columns
+from graph_helpers import MANUAL_SHOT_LIMITS
+from ingest import load_bags
+
+
+def loaded(df):
+    """Shots as kept before compaction: object clubs and shots, float64."""
+    df = derive_columns(df, MANUAL_SHOT_LIMITS)
+    return df.assign(Shot=df["Shot"].astype(object), Club=df["Club"].astype(object))
+
+
+def compacted(df):
+    return derive_columns(compact(df), MANUAL_SHOT_LIMITS)
+
+
+def report(name, df):
+    before = loaded(df.astype({col: "float64" for col in df.columns[1:]}))
+    after = compacted(df)
+    columns = before.memory_usage(deep=True, index=False)
+    compact_columns = after.memory_usage(deep=True, index=False)
+
+    print(f"{name}: {len(df)} shots")
+    for col in columns.index:
+        print(
+            f"  {col:<16} {str(before[col].dtype):<8} {columns[col]:>12,}"
+            f"  {str(after[col].dtype):<8} {compact_columns[col]:>12,}"
+        )
+    print(
+        f"  {'total':<16} {'':<8} {columns.sum():>12,}  {'':<8}"
+        f" {compact_columns.sum():>12,}  ({compact_columns.sum() / columns.sum():.0%})"
+    )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100_000, 1_000_000])
+    args = parser.parse_args(argv)
+
+    for golf_bag, df in load_bags(DATA_PATH).items():
+        report(golf_bag, df)
+    for n in args.sizes:
+        report("synthetic", synthetic_shots(n))
+
+
+if __name__ == "__main__":
+    main()
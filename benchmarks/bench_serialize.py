@@ -0,0 +1,112 @@
+"""Bytes per second of building and encoding figures, per figure backend.
+
+python -m benchmarks.bench_serialize --sizes 1000 100000 1000000
+"""
+
+import argparse
+import json
+import platform
+import statistics
+import time
+from datetime import datetime, timezone
+
+import numpy as np
+import pandas as pd
+import plotly
+from dash._utils import to_json
+
+from benchmarks.synthetic import synthetic_shots
+from dataset import compact
+from figures import (
+    build_bag_figure,
+    build_club_figure,
+    build_consolidated_figure,
+    encode_figure,
+    prepare,
+)
+from graph_helpers import MANUAL_SHOT_LIMITS
+from plain_figure import HAS_ORJSON
+
+BUILDERS = {
+    "bag": build_bag_figure,
+    "consolidated": build_consolidated_figure,
+    "club": lambda bag, backend: build_club_figure(bag, bag.clubs[0], backend),
+}
+BACKENDS = ["plotly", "plain"]
+
+
+def timed(runs, func, *args):
+    seconds = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        result = func(*args)
+        seconds.append(time.perf_counter() - start)
+    return result, statistics.median(seconds)
+
+
+def bench_size(n, runs):
+    bag = prepare(compact(synthetic_shots(n)), MANUAL_SHOT_LIMITS)
+    results = []
+    for figure, build in BUILDERS.items():
+        for backend in BACKENDS:
+            fig, build_seconds = timed(runs, build, bag, backend)
+            # What Dash does with a callback's figure, and /figure
+            payload, dash_seconds = timed(runs, to_json, fig)
+            body, encode_seconds = timed(runs, encode_figure, fig)
+            results.append(
+                {
+                    "shots": n,
+                    "figure": figure,
+                    "backend": backend,
+                    "traces": len(fig.data),
+                    "payload_bytes": len(payload.encode()),
+                    "body_bytes": len(body),
+                    "build_seconds": build_seconds,
+                    "dash_seconds": dash_seconds,
+                    "encode_seconds": encode_seconds,
+                    "dash_bytes_per_second": len(payload.encode()) / dash_seconds,
+                    "callback_bytes_per_second": len(payload.encode())
+                    / (build_seconds + dash_seconds),
+                }
+            )
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--sizes", type=int, nargs="+", default=[1000, 100_000, 1_000_000]
+    )
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--output", default="benchmarks/serialize_results.json")
+    args = parser.parse_args(argv)
+
+    results = []
+    for n in args.sizes:
+        for row in bench_size(n, args.runs):
+            print(
+                f"{row['shots']:>9} {row['figure']:<13} {row['backend']:<7}"
+                f" build {row['build_seconds']:.4f}s"
+                f" encode {row['dash_seconds']:.4f}s"
+                f" {row['dash_bytes_per_second'] / 1e6:7.1f} MB/s"
+                f" build+encode {row['callback_bytes_per_second'] / 1e6:6.1f} MB/s"
+            )
+            results.append(row)
+
+    report = {
+        "created": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "numpy": np.__version__,
+        "pandas": pd.__version__,
+        "plotly": plotly.__version__,
+        "orjson": HAS_ORJSON,
+        "results": results,
+    }
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+"""Time from starting the app to its first bytes, with and without deferred load.
+
+python -m benchmarks.bench_startup --runs 3
+"""
+
+import argparse
+import json
+import os
+import platform
+import socket
+import statistics
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+from datetime import datetime, timezone
+
+MODES = {
+    "eager": {"TOPYARDAGE_DEFERRED_LOAD": "0"},
+    "deferred": {"TOPYARDAGE_DEFERRED_LOAD": "1"},
+}
+TIMEOUT = 120
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def import_seconds(env):
+    """Seconds to import app, net of starting the interpreter."""
+    seconds = []
+    for code in ("pass", "import app"):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, "-c", code], env=env, check=True)
+        seconds.append(time.perf_counter() - start)
+    return seconds[1] - seconds[0]
+
+
+def first_byte(url, start):
+    """Seconds from start to the first byte of url, polling until it answers."""
+    while time.perf_counter() - start < TIMEOUT:
+        try:
+            with urllib.request.urlopen(url) as response:
+                response.read(1)
+                return time.perf_counter() - start, response.status
+        except urllib.error.HTTPError as error:
+            return time.perf_counter() - start, error.code
+        except OSError:
+            time.sleep(0.01)
+    raise TimeoutError(url)
+
+
+def until_ready(url, start):
+    while time.perf_counter() - start < TIMEOUT:
+        try:
+            with urllib.request.urlopen(url):
+                return time.perf_counter() - start
+        except OSError:
+            time.sleep(0.05)
+    raise TimeoutError(url)
+
+
+def bench_mode(mode, env):
+    port = free_port()
+    base = f"http://127.0.0.1:{port}"
+    start = time.perf_counter()
+    server = subprocess.Popen(
+        [sys.executable, "-c", f"import app; app.server.run(port={port})"],
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    try:
+        index, _ = first_byte(f"{base}/", start)
+        layout, _ = first_byte(f"{base}/_dash-layout", start)
+        ready = until_ready(f"{base}/ready", start)
+    finally:
+        server.terminate()
+        server.wait()
+    return {
+        "mode": mode,
+        "import_seconds": import_seconds(env),
+        "index_seconds": index,
+        "layout_seconds": layout,
+        "ready_seconds": ready,
+    }
+
+
+def summarize(mode, runs):
+    summary = {"mode": mode, "runs": runs}
+    for field in ("import_seconds", "index_seconds", "layout_seconds", "ready_seconds"):
+        summary[f"median_{field}"] = statistics.median(run[field] for run in runs)
+    return summary
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--output", default="benchmarks/startup_results.json")
+    args = parser.parse_args(argv)
+
+    results = []
+    for mode, overrides in MODES.items():
+        env = {**os.environ, **overrides}
+        summary = summarize(mode, [bench_mode(mode, env) for _ in range(args.runs)])
+        print(
+            f"{mode:<9} import {summary['median_import_seconds']:.3f}s"
+            f"  / {summary['median_index_seconds']:.3f}s"
+            f"  /_dash-layout {summary['median_layout_seconds']:.3f}s"
+            f"  /ready {summary['median_ready_seconds']:.3f}s"
+        )
+        results.append(summary)
+
+    report = {
+        "created": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "results": results,
+    }
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+"""Time each stage of update_graph on synthetic bags.
+
+python -m benchmarks.bench_update_graph --sizes 1000 100000 1000000
+"""
+
+import argparse
+import json
+import platform
+import statistics
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import plotly
+
+from benchmarks.synthetic import synthetic_shots
+from figures import bag_data, build_bag_figure, club_stats
+from graph_helpers import MANUAL_SHOT_LIMITS, shot_type, shot_types
+from ingest import _read_sheet, _write_sheet
+
+
+def timed(runs, func, *args):
+    seconds = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        result = func(*args)
+        seconds.append(time.perf_counter() - start)
+    return result, seconds
+
+
+def derive(df):
+    return df.assign(
+        Offset=df["Offline"] - df["Curve"],
+        Roll=df["Total Distance"] - df["Flat Carry"],
+    )
+
+
+def classify(df):
+    return df.assign(Shot=shot_types(df, MANUAL_SHOT_LIMITS))
+
+
+def classify_row_wise(df):
+    return df.apply(lambda x: shot_type(x, MANUAL_SHOT_LIMITS), axis=1)
+
+
+def aggregate(df):
+    return bag_data(df, club_stats(df))
+
+
+def serialize(fig):
+    return fig.to_json()
+
+
+def bench_size(n, runs, row_wise_limit, workdir):
+    shots = synthetic_shots(n)
+    file = Path(workdir) / f"{n}.feather"
+    mixed = _write_sheet(shots, file)
+
+    stages = {}
+    df, stages["load"] = timed(runs, _read_sheet, file, mixed)
+    df, stages["derive"] = timed(runs, derive, df)
+    df, stages["classify"] = timed(runs, classify, df)
+    if n <= row_wise_limit:
+        _, stages["classify_row_wise"] = timed(1, classify_row_wise, df)
+    bag, stages["aggregate"] = timed(runs, aggregate, df)
+    fig, stages["build_figure"] = timed(runs, build_bag_figure, bag)
+    payload, stages["serialize"] = timed(runs, serialize, fig)
+
+    return [
+        {
+            "shots": n,
+            "stage": stage,
+            "median_seconds": statistics.median(seconds),
+            "min_seconds": min(seconds),
+            "runs": seconds,
+            "traces": len(fig.data),
+            "payload_bytes": len(payload),
+        }
+        for stage, seconds in stages.items()
+    ]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--sizes", type=int, nargs="+", default=[1000, 100_000, 1_000_000]
+    )
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument(
+        "--row-wise-limit",
+        type=int,
+        default=100_000,
+        help="largest bag also classified with the row-wise shot_type",
+    )
+    parser.add_argument("--output", default="benchmarks/results.json")
+    args = parser.parse_args(argv)
+
+    results = []
+    with tempfile.TemporaryDirectory() as workdir:
+        for n in args.sizes:
+            rows = bench_size(n, args.runs, args.row_wise_limit, workdir)
+            for row in rows:
+                print(
+                    f"{row['shots']:>9} {row['stage']:<18} {row['median_seconds']:.4f}s"
+                )
+            results.extend(rows)
+
+    report = {
+        "created": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "numpy": np.__version__,
+        "pandas": pd.__version__,
+        "plotly": plotly.__version__,
+        "results": results,
+    }
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+import numpy as np
+import pandas as pd
+
+from graph_helpers import CLUB_ORDER, MANUAL_SHOT_LIMITS
+
+# Typical carry and roll in metres, in CLUB_ORDER
+CARRY = [170, 160, 155, 150, 148, 145, 140, 133, 123, 111, 101, 93, 85, 82, 75, 65, 56]
+ROLL = [30, 20, 18, 10, 18, 12, 11, 6, 4, 2, 2, 3, 1, 3, 1, 2, 1]
+
+COLUMNS = [
+    "Club",
+    "Ball Speed",
+    "Launch Angle",
+    "Height",
+    "Curve",
+    "Offline",
+    "Flat Carry",
+    "Total Distance",
+]
+
+
+def synthetic_shots(n: int, seed: int = 0) -> pd.DataFrame:
+    """Random range session in the workbook's schema, all clubs in CLUB_ORDER.
+
+    Every metric is drawn around the club's MANUAL_SHOT_LIMITS so that the
+    classification yields a realistic mix of shot types.
+    """
+    rng = np.random.default_rng(seed)
+    club = rng.integers(0, len(CLUB_ORDER), n)
+
+    limits = [MANUAL_SHOT_LIMITS[name] for name in CLUB_ORDER]
+    ball_speed = np.array([limit["Ball Speed"] for limit in limits])[club]
+    launch = np.array([limit["Launch Angle"] for limit in limits])[club]
+    height = np.array([limit["Height"] for limit in limits])[club]
+    curve = np.array([limit["Curve"] for limit in limits])[club]
+    offset = np.array([limit["Offset"] for limit in limits])[club]
+
+    shot_curve = rng.normal(0, curve)
+    carry = rng.normal(np.array(CARRY)[club], 10)
+    roll = np.abs(rng.normal(np.array(ROLL)[club], 4))
+
+    df = pd.DataFrame(
+        {
+            "Club": pd.Series(np.array(CLUB_ORDER, dtype=object)[club]),
+            "Ball Speed": rng.normal(ball_speed + 2, 3),
+            "Launch Angle": rng.normal(launch.mean(axis=1), np.ptp(launch, axis=1) / 2),
+            "Height": rng.normal(height.mean(axis=1), np.ptp(height, axis=1) / 2),
+            "Curve": shot_curve,
+            "Offline": shot_curve + rng.normal(0, offset),
+            "Flat Carry": carry,
+            "Total Distance": carry + roll,
+        }
+    )
+    metrics = COLUMNS[1:]
+    df[metrics] = df[metrics].round().astype(int)
+    return df
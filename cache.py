@@ -0,0 +1,89 @@
+import hashlib
+import threading
+from collections import OrderedDict
+
+
+def frame_version(df) -> str:
+    """Content hash of a frame, stable across processes."""
+    # Imported here, app.py imports FigureCache before the data is loaded
+    import pandas as pd
+
+    # Numbers hash by their bytes and categories once each, hence the dtypes
+    hashed = pd.util.hash_pandas_object(df, index=False).to_numpy()
+    digest = hashlib.sha1(hashed.tobytes())
+    digest.update(repr(list(df.dtypes.items())).encode())
+    return digest.hexdigest()[:16]
+
+
+def limits_version(shot_limit: dict) -> str:
+    items = sorted(shot_limit.items(), key=lambda item: str(item[0]))
+    return hashlib.sha1(repr(items).encode()).hexdigest()[:16]
+
+
+def club_limits_versions(shot_limit: dict) -> dict:
+    """limits_version of each club's own limits."""
+    return {club: limits_version(limit) for club, limit in shot_limit.items()}
+
+
+class FigureCache:
+    """Thread-safe LRU of built figures with hit/miss counters."""
+
+    def __init__(self, maxsize=32):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._items)
+
+    def __contains__(self, key):
+        return key in self._items
+
+    def get(self, key, default=None):
+        with self._lock:
+            try:
+                value = self._items[key]
+            except KeyError:
+                self.misses += 1
+                return default
+            self._items.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key, value):
+        with self._lock:
+            self._items[key] = value
+            self._items.move_to_end(key)
+            while len(self._items) > self.maxsize:
+                self._items.popitem(last=False)
+
+    def get_or_build(self, key, build):
+        sentinel = object()
+        value = self.get(key, sentinel)
+        if value is sentinel:
+            # Built outside the lock, two racing misses just build twice
+            value = build()
+            self.put(key, value)
+        return value
+
+    def invalidate(self, stale) -> int:
+        """Drop the entries whose key stale(key) is true, returns how many."""
+        with self._lock:
+            keys = [key for key in self._items if stale(key)]
+            for key in keys:
+                del self._items[key]
+        return len(keys)
+
+    def clear(self):
+        with self._lock:
+            self._items.clear()
+
+    def stats(self) -> dict:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "size": len(self._items),
+            "maxsize": self.maxsize,
+        }
@@ -0,0 +1,206 @@
+"""Per-club shot limits calibrated on a player's own shots.
+
+python calibration.py shots.db --bag PdH --output limits.json
+python calibration.py "data/Golf Range.xlsx" --output limits.json
+python calibration.py shots.db --per-bag --output limits.json
+"""
+
+import argparse
+from collections import Counter
+
+import numpy as np
+import pandas as pd
+
+from graph_helpers import CLUB_ORDER, MANUAL_SHOT_LIMITS
+from ingest import load_bags
+from limits import save_limits
+
+# Values are sketched rounded to this, exact for Topgolf's whole numbers
+RESOLUTION = 0.5
+
+# Clubs with fewer shots keep their fallback limits
+MIN_SHOTS = 30
+
+# Percentile of the club's sketched metric each limit is set at. Curve,
+# Offset and Offline are sketched as absolute values. The defaults
+# reproduce MANUAL_SHOT_LIMITS on the bundled workbook within a few units.
+RULES = {
+    "Ball Speed": ("Ball Speed", 60),
+    "Launch Angle": ("Launch Angle", (20, 90)),
+    "Height": ("Height", (20, 90)),
+    "Straight": ("Curve", 25),
+    "Curve": ("Curve", 50),
+    "Offset": ("Offset", 50),
+    "Offline": ("Offline", 50),
+}
+
+
+class QuantileSketch:
+    """Mergeable histogram of values rounded to resolution.
+
+    Its size is bounded by the range of the values over the resolution,
+    not by their number, and merging two sketches adds their counts. Bags
+    and sessions are sketched separately and merged for calibration.
+    """
+
+    def __init__(self, counts=None, resolution=RESOLUTION):
+        self.resolution = resolution
+        self.counts = Counter(counts or {})
+
+    def __len__(self):
+        return sum(self.counts.values())
+
+    def update(self, values):
+        values = np.asarray(values, dtype="float64")
+        bins, counts = np.unique(
+            np.round(values[~np.isnan(values)] / self.resolution).astype("int64"),
+            return_counts=True,
+        )
+        self.counts.update(dict(zip(bins.tolist(), counts.tolist())))
+        return self
+
+    def merge(self, other):
+        if other.resolution != self.resolution:
+            raise ValueError("Sketches of different resolutions")
+        self.counts.update(other.counts)
+        return self
+
+    def quantile(self, q) -> float:
+        """Value of rank q * (n - 1), for q between 0 and 1, NaN when empty."""
+        if not self.counts:
+            return float("nan")
+        bins = np.array(sorted(self.counts))
+        cumulative = np.cumsum([self.counts[b] for b in bins])
+        index = np.searchsorted(cumulative, q * (cumulative[-1] - 1), side="right")
+        return bins[index] * self.resolution
+
+
+def sketch_values(shots: pd.DataFrame) -> pd.DataFrame:
+    """The metrics RULES refer to, one row per shot."""
+    return pd.DataFrame(
+        {
+            "Club": shots["Club"].astype(object),
+            "Ball Speed": shots["Ball Speed"],
+            "Launch Angle": shots["Launch Angle"],
+            "Height": shots["Height"],
+            "Curve": shots["Curve"].abs(),
+            "Offset": (shots["Offline"] - shots["Curve"]).abs(),
+            "Offline": shots["Offline"].abs(),
+        }
+    )
+
+
+def sketch_counts(shots: pd.DataFrame, resolution=RESOLUTION) -> pd.Series:
+    """Shots per (Club, metric, bin), what they add to the clubs' sketches."""
+    values = sketch_values(shots).melt(
+        id_vars="Club", var_name="metric", value_name="value"
+    )
+    values = values.dropna(subset=["value"])
+    values["bin"] = np.round(values["value"] / resolution).astype("int64")
+    return values.groupby(["Club", "metric", "bin"], sort=False).size()
+
+
+def club_sketches(counts: pd.Series, resolution=RESOLUTION) -> dict:
+    """{club: {metric: QuantileSketch}} of sketch_counts."""
+    sketches = {}
+    for (club, metric), group in counts.groupby(level=["Club", "metric"], sort=False):
+        bins = group.index.get_level_values("bin")
+        sketches.setdefault(club, {})[metric] = QuantileSketch(
+            dict(zip(bins, group.to_numpy())), resolution
+        )
+    return sketches
+
+
+def merge_sketches(*sketches) -> dict:
+    merged = {}
+    for clubs in sketches:
+        for club, metrics in clubs.items():
+            for metric, sketch in metrics.items():
+                merged.setdefault(club, {}).setdefault(
+                    metric, QuantileSketch(resolution=sketch.resolution)
+                ).merge(sketch)
+    return merged
+
+
+def calibrate(sketches: dict, fallback=MANUAL_SHOT_LIMITS, min_shots=MIN_SHOTS):
+    """Limits of every club in CLUB_ORDER from its sketches, per RULES.
+
+    Clubs with fewer than min_shots shots keep their fallback limits, if
+    they have any, and so do the limits of a metric with fewer values. A
+    club without fallback limits is left out in either case.
+    """
+    limits = {}
+    for club in CLUB_ORDER:
+        metrics = sketches.get(club, {})
+        if len(metrics.get("Ball Speed", ())) < min_shots:
+            if club in fallback:
+                limits[club] = fallback[club]
+            continue
+
+        limit = {}
+        for field, (metric, percentile) in RULES.items():
+            sketch = metrics.get(metric, ())
+            if len(sketch) < min_shots:
+                if club not in fallback:
+                    break
+                limit[field] = fallback[club][field]
+            elif isinstance(percentile, tuple):
+                limit[field] = tuple(
+                    round(sketch.quantile(p / 100)) for p in percentile
+                )
+            else:
+                limit[field] = round(sketch.quantile(percentile / 100))
+        else:
+            limits[club] = limit
+    return limits
+
+
+def main(argv=None):
+    # shot_store imports this module to keep the sketches of its bags
+    from shot_store import ShotStore
+
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("source", help="shot store, or workbook or data directory")
+    parser.add_argument(
+        "--bag", action="append", help="bag to calibrate on, by default all merged"
+    )
+    parser.add_argument(
+        "--per-bag",
+        action="store_true",
+        help="also calibrate each bag on its own shots, the merged limits as fallback",
+    )
+    parser.add_argument("--min-shots", type=int, default=MIN_SHOTS)
+    parser.add_argument("--output", help="limits file, printed when missing")
+    args = parser.parse_args(argv)
+
+    if args.source.endswith(".db"):
+        store = ShotStore(args.source)
+        sketches = {bag: store.sketches(bag) for bag in args.bag or store.bags()}
+    else:
+        bags = load_bags(args.source)
+        sketches = {
+            bag: club_sketches(sketch_counts(bags[bag])) for bag in args.bag or bags
+        }
+    limits = calibrate(merge_sketches(*sketches.values()), min_shots=args.min_shots)
+    bag_limits = {}
+    if args.per_bag:
+        bag_limits = {
+            bag: calibrate(sketch, fallback=limits, min_shots=args.min_shots)
+            for bag, sketch in sketches.items()
+        }
+
+    if args.output:
+        save_limits(limits, args.output, bag_limits)
+        print(f"{len(limits)} clubs written to {args.output}")
+        if bag_limits:
+            print(f"Own limits of {', '.join(bag_limits)}")
+    else:
+        for club, limit in limits.items():
+            print(club, limit)
+        for bag, bag_limit in bag_limits.items():
+            for club, limit in bag_limit.items():
+                print(bag, club, limit)
+
+
+if __name__ == "__main__":
+    main()
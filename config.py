@@ -0,0 +1,78 @@
+import os
+from pathlib import Path
+
+# Workbook with one sheet per golf bag, or a directory of such workbooks
+DATA_PATH = Path(
+    os.environ.get(
+        "TOPYARDAGE_DATA_PATH", Path(__file__).parent / "data" / "Golf Range.xlsx"
+    )
+)
+
+# Processes parsing the workbooks of a data directory, default one per core
+LOAD_PROCESSES = int(os.environ.get("TOPYARDAGE_LOAD_PROCESSES", 0)) or None
+
+# pandas engine reading the workbooks, "calamine" or "openpyxl", by default
+# calamine when python-calamine is installed
+EXCEL_ENGINE = os.environ.get("TOPYARDAGE_EXCEL_ENGINE")
+
+# Club shown when a bag is selected, when the bag has it
+DEFAULT_CLUB = 8
+
+# Radio labels of the bags, by sheet name
+BAG_LABELS = {"PdH": "Puerta de Hierro", "LG": "La Granja"}
+
+# SQLite shot store filled by shot_store.py, read instead of the workbook
+SHOT_STORE = os.environ.get("TOPYARDAGE_SHOT_STORE")
+
+# Directory where the first worker to load the data publishes it as
+# memory-mapped Arrow files, attached by every other gunicorn worker
+SHARED_DIR = os.environ.get("TOPYARDAGE_SHARED_DIR")
+
+# JSON file of the shot limits, see limits.py, reloaded when edited like the
+# data. By default graph_helpers.MANUAL_SHOT_LIMITS
+LIMITS_PATH = os.environ.get("TOPYARDAGE_LIMITS")
+
+# Bind the server before the data is loaded, which then happens in a
+# background thread. Callbacks answer with a placeholder until it is done
+DEFERRED_LOAD = os.environ.get("TOPYARDAGE_DEFERRED_LOAD", "0") not in ("", "0")
+
+# Seconds between checks for changes of the data, 0 turns reloading off
+RELOAD_INTERVAL = float(os.environ.get("TOPYARDAGE_RELOAD_INTERVAL", 5))
+
+# How the shot tracer is rendered:
+#   "menu": every club in one figure, switched with plotly's updatemenus
+#   "consolidated": same figure as "menu" with one trace per shot category,
+#                   the club menu restyles their data instead of toggling
+#                   one set of traces per club
+#   "club": only the selected club is built and sent, switching clubs
+#           patches the traces of the figure already in the browser
+#   "client": every club's traces are sent once to a dcc.Store and the
+#             browser assembles the selected club's figure by itself
+RENDER_MODE = os.environ.get("TOPYARDAGE_RENDER_MODE", "menu")
+
+FIGURE_CACHE_SIZE = int(os.environ.get("TOPYARDAGE_FIGURE_CACHE_SIZE", 32))
+
+# "plotly" builds figures from validated graph objects, "plain" from plain
+# dicts encoded with orjson, about ten times faster to build and encode
+FIGURE_BACKEND = os.environ.get("TOPYARDAGE_FIGURE_BACKEND", "plotly")
+
+# Seconds browsers may reuse a figure of /figure before revalidating its ETag
+FIGURE_MAX_AGE = int(os.environ.get("TOPYARDAGE_FIGURE_MAX_AGE", 0))
+
+# Seconds between checks for a new data version in "client" mode
+DATA_REFRESH_INTERVAL = float(os.environ.get("TOPYARDAGE_DATA_REFRESH_INTERVAL", 60))
+
+# Every figure of the data is built into the figure cache in a process pool
+# of WARMUP_PROCESSES, default one per core, at startup and on data changes
+WARMUP = os.environ.get("TOPYARDAGE_WARMUP", "0") not in ("", "0")
+WARMUP_PROCESSES = int(os.environ.get("TOPYARDAGE_WARMUP_PROCESSES", 0)) or None
+
+# Stage timings, trace counts and response sizes, served on /metrics
+METRICS_ENABLED = os.environ.get("TOPYARDAGE_METRICS", "0") not in ("", "0")
+
+# Good shots of a club are drawn with WebGL above SCATTERGL_THRESHOLD shots
+# and as a density heatmap of DENSITY_BIN_SIZE metre bins above
+# DENSITY_THRESHOLD shots
+SCATTERGL_THRESHOLD = int(os.environ.get("TOPYARDAGE_SCATTERGL_THRESHOLD", 2000))
+DENSITY_THRESHOLD = int(os.environ.get("TOPYARDAGE_DENSITY_THRESHOLD", 50000))
+DENSITY_BIN_SIZE = float(os.environ.get("TOPYARDAGE_DENSITY_BIN_SIZE", 1))
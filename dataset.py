@@ -0,0 +1,159 @@
+import logging
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import Mapping
+
+import numpy as np
+import pandas as pd
+
+from cache import club_limits_versions, frame_version, limits_version
+from figures import BagData, bag_data, prepare, reclassify
+from graph_helpers import CLUB_DTYPE, CLUB_ORDER, SHOT_DTYPE
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class Snapshot:
+    """Enriched data of every bag for one data version.
+
+    Snapshots are shared by every request and never modified, a new data
+    version is published as a new snapshot.
+    """
+
+    bags: Mapping[str, BagData]
+    data_versions: Mapping[str, str]
+    # Per bag, the version of the limits it is classified with, and of each
+    # of their clubs
+    bag_limits: Mapping[str, str]
+    club_limits: Mapping[str, Mapping[object, str]]
+
+    @property
+    def limits_version(self) -> str:
+        return limits_version(self.bag_limits)
+
+    @property
+    def version(self) -> str:
+        return "-".join([*self.data_versions.values(), self.limits_version])
+
+    def versions(self, golf_bag, club=None) -> tuple:
+        """Versions of the data and limits a figure of the bag depends on.
+
+        Only the limits of the bag's clubs, or of the one club, count.
+        """
+        clubs = self.bags[golf_bag].clubs if club is None else [club]
+        club_limits = self.club_limits[golf_bag]
+        limits = {club: club_limits.get(club) for club in clubs}
+        return self.data_versions[golf_bag], limits_version(limits)
+
+
+def changed_clubs(previous: Snapshot, golf_bag, shot_limit: dict) -> set:
+    """Clubs whose limits differ from the ones previous classified golf_bag with."""
+    versions = club_limits_versions(shot_limit)
+    before = previous.club_limits.get(golf_bag, {})
+    return {
+        club
+        for club in versions.keys() | before.keys()
+        if versions.get(club) != before.get(club)
+    }
+
+
+def _snapshot(bags: dict, data_versions: dict, limits: dict) -> Snapshot:
+    return Snapshot(
+        bags=MappingProxyType(bags),
+        data_versions=MappingProxyType(data_versions),
+        bag_limits=MappingProxyType(
+            {golf_bag: limits_version(limit) for golf_bag, limit in limits.items()}
+        ),
+        club_limits=MappingProxyType(
+            {
+                golf_bag: MappingProxyType(club_limits_versions(limit))
+                for golf_bag, limit in limits.items()
+            }
+        ),
+    )
+
+
+def compact(df: pd.DataFrame) -> pd.DataFrame:
+    """Frame with categorical clubs and shots, and float32 metrics.
+
+    Club follows CLUB_ORDER and Shot the SHOT_COLOR keys. A numeric column
+    is only downcast when every value survives the round trip to float32.
+    """
+    club = df["Club"]
+    unknown = club.notna() & ~club.isin(CLUB_ORDER)
+    if unknown.any():
+        raise KeyError(club[unknown].iloc[0])
+
+    columns = {"Club": club.astype(CLUB_DTYPE)}
+    if "Shot" in df.columns:
+        columns["Shot"] = df["Shot"].astype(SHOT_DTYPE)
+    for column in df.columns.drop(["Club", "Shot"], errors="ignore"):
+        if df[column].dtype.kind not in "fi":
+            continue
+        values = df[column].to_numpy(dtype="float64")
+        downcast = values.astype("float32")
+        if np.array_equal(downcast, values, equal_nan=True):
+            columns[column] = downcast
+    return df.assign(**columns)
+
+
+def build_snapshot(
+    frames: dict, shot_limit: dict, previous=None, bag_limits=None
+) -> Snapshot:
+    """Derive, classify and aggregate every bag once for the snapshot.
+
+    Bags are classified with their own limits in bag_limits, shot_limit if
+    they have none. Bags whose data is unchanged since the previous snapshot
+    are reused, only the shots of clubs with new limits are classified again.
+    """
+    bag_limits = bag_limits or {}
+    bags = {}
+    data_versions = {}
+    limits = {}
+    for golf_bag, df in frames.items():
+        limit = limits[golf_bag] = bag_limits.get(golf_bag, shot_limit)
+        df = compact(df)
+        data_versions[golf_bag] = frame_version(df)
+        if previous is not None and previous.data_versions.get(golf_bag) == (
+            data_versions[golf_bag]
+        ):
+            clubs = changed_clubs(previous, golf_bag, limit)
+            bags[golf_bag] = reclassify(previous.bags[golf_bag], limit, clubs)
+        else:
+            bags[golf_bag] = prepare(df, limit)
+
+    return _snapshot(bags, data_versions, limits)
+
+
+def build_store_snapshot(
+    store, shot_limit: dict, previous=None, bag_limits=None
+) -> Snapshot:
+    """Snapshot of a ShotStore, reading its aggregates instead of the shots'.
+
+    Limits as in build_snapshot. When a bag was stored classified with the
+    limits of the previous snapshot, only the shots of clubs with new limits
+    are classified again.
+    """
+    bag_limits = bag_limits or {}
+    bags = {}
+    data_versions = {}
+    limits = {}
+    for golf_bag in store.bags():
+        limit = limits[golf_bag] = bag_limits.get(golf_bag, shot_limit)
+        stored = store.limits_versions(golf_bag)
+        if stored - {limits_version(limit)}:
+            clubs = None
+            if previous is not None and stored == {previous.bag_limits.get(golf_bag)}:
+                clubs = changed_clubs(previous, golf_bag, limit)
+            logger.info(
+                "Limits of %s changed, reclassifying %s", golf_bag, clubs or "all"
+            )
+            store.reclassify(limit, clubs, golf_bag)
+
+        data_versions[golf_bag] = store.version(golf_bag)
+        bags[golf_bag] = bag_data(
+            compact(store.shots(golf_bag)), store.club_stats(golf_bag)
+        )
+
+    return _snapshot(bags, data_versions, limits)
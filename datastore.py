@@ -0,0 +1,102 @@
+"""The current Snapshot and its reloading, without importing pandas."""
+
+import logging
+import os
+import threading
+
+logger = logging.getLogger(__name__)
+
+
+class DataStore:
+    """Holds the current snapshot and swaps in new ones atomically.
+
+    Callbacks take current() once and use that snapshot throughout, so a
+    publish in the middle of a request never mixes two versions.
+    """
+
+    def __init__(self, snapshot=None):
+        self._snapshot = snapshot
+        self._lock = threading.Lock()
+        self._subscribers = []
+
+    def current(self):
+        return self._snapshot
+
+    def subscribe(self, callback):
+        """Call callback(previous, snapshot) after every publish."""
+        self._subscribers.append(callback)
+
+    def publish(self, snapshot):
+        with self._lock:
+            previous, self._snapshot = self._snapshot, snapshot
+        for callback in self._subscribers:
+            try:
+                callback(previous, snapshot)
+            except Exception:
+                logger.exception("Subscriber %r failed", callback)
+
+
+def _file_state(path):
+    if isinstance(path, (list, tuple)):
+        return tuple(_file_state(each) for each in path)
+    if os.path.isdir(path):
+        from ingest import discover_workbooks
+
+        return tuple(
+            (workbook.name, _file_state(workbook))
+            for workbook in discover_workbooks(path)
+        )
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+class DataWatcher(threading.Thread):
+    """Reloads the data off the request path when the file changes.
+
+    A directory counts as changed when any of its workbooks does, or when
+    one is added or removed.
+
+    load() runs in this thread and returns the new Snapshot, which is then
+    published to the store. Requests keep serving the previous snapshot
+    until the publish. A failed load, e.g. of a half-written workbook, is
+    logged and retried on the next check.
+    """
+
+    def __init__(self, store: DataStore, path, load, interval: float):
+        super().__init__(name="topyardage-data-watcher", daemon=True)
+        self.store = store
+        self.path = path
+        self.load = load
+        self.interval = interval
+        self._state = _file_state(path)
+        self._stopped = threading.Event()
+
+    def check(self) -> bool:
+        """Reload if the file changed, True when a new snapshot was published."""
+        state = _file_state(self.path)
+        if state is None or state == self._state:
+            return False
+
+        try:
+            snapshot = self.load()
+        except Exception:
+            logger.exception("Reloading %s failed", self.path)
+            return False
+        self._state = state
+
+        current = self.store.current()
+        if current is not None and snapshot.version == current.version:
+            return False
+        self.store.publish(snapshot)
+        logger.info("Published data version %s", snapshot.version)
+        return True
+
+    def run(self):
+        while not self._stopped.wait(self.interval):
+            self.check()
+
+    def stop(self):
+        self._stopped.set()
@@ -0,0 +1,999 @@
+from typing import NamedTuple
+
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+
+from config import (
+    DEFAULT_CLUB,
+    DENSITY_BIN_SIZE,
+    DENSITY_THRESHOLD,
+    FIGURE_BACKEND,
+    SCATTERGL_THRESHOLD,
+)
+from metrics import observe_traces, timed
+from plain_figure import PlainFigure, default_template, plain_trace, static
+from graph_helpers import (
+    shot_types,
+    SHOT_COLOR,
+    HOVER_TEMPLATE,
+    DENSITY_HOVER_TEMPLATE,
+    CLUB_ORDER,
+)
+
+AXIS_RANGE = 30
+
+# Traces of build_consolidated_figure, each merges the traces with these metas
+TRACE_GROUPS = {
+    "Miss Hit": ["Miss Hit"],
+    "Flat": ["Flat"],
+    "Good": ["Good"],
+    "Fade": ["Fade"],
+    "Draw": ["Draw"],
+    "Push": ["Push"],
+    "Slice": ["Slice"],
+    "Slice/Push": ["Slice/Push"],
+    "Pull": ["Pull"],
+    "Hook": ["Hook"],
+    "Hook/Pull": ["Hook/Pull"],
+    "Offline Line": ["Offline Line"],
+    "Soft Line": ["Soft Line"],
+    "Roll": ["Roll"],
+    "Labels": ["Carry Label", "Offline Label", "Soft Label"],
+    "Good Shots": ["Good Shots"],
+}
+RESTYLED = ["x", "y", "z", "text", "customdata"]
+TRACE_TYPES = {"scatter": go.Scatter, "scattergl": go.Scattergl, "heatmap": go.Heatmap}
+
+# Green, centre line and miss hit frame drawn under every club
+SHAPES = static(
+    [
+        {
+            "type": "circle",
+            "xref": "x",
+            "yref": "y",
+            "x0": 15,
+            "y0": 15,
+            "x1": -15,
+            "y1": -15,
+            "line": {"color": "#55A868"},
+            "fillcolor": "#55A868",
+            "layer": "below",
+        },
+        {
+            "type": "line",
+            "x0": 15,
+            "x1": -15,
+            "y0": 0,
+            "y1": 0,
+            "line": {"dash": "dot"},
+        },
+        {
+            "type": "rect",
+            "x0": 15,
+            "y0": -18,
+            "x1": -15,
+            "y1": -23,
+            "line": {"color": SHOT_COLOR["Miss Hit"]},
+        },
+    ]
+)
+ORIGIN = static(
+    {
+        "type": "scatter",
+        "meta": "Origin",
+        "x": [0],
+        "y": [0],
+        "mode": "markers",
+        "marker": {"color": "red"},
+        "hoverinfo": "skip",
+        "showlegend": False,
+    }
+)
+AXIS = static(
+    {"range": [-AXIS_RANGE, AXIS_RANGE], "visible": False, "showticklabels": False}
+)
+
+
+def new_figure(backend=FIGURE_BACKEND):
+    return PlainFigure() if backend == "plain" else go.Figure()
+
+
+def new_trace(fig, trace_type, **props):
+    """Trace to add to fig, a plain dict when fig is a PlainFigure."""
+    if isinstance(fig, PlainFigure):
+        return plain_trace(trace_type, **props)
+    return TRACE_TYPES[trace_type](**props)
+
+
+def trace_json(trace) -> dict:
+    return trace if isinstance(trace, dict) else trace.to_plotly_json()
+
+
+def encode_figure(fig) -> bytes:
+    return fig.encode() if isinstance(fig, PlainFigure) else fig.to_json().encode()
+
+
+def _prop(trace, name):
+    return trace[name] if name in trace else None
+
+
+class BagData(NamedTuple):
+    shots: object
+    stats: object
+    good: dict
+    clubs: list
+
+
+def derive_columns(df, shot_limit):
+    with timed("derive"):
+        df = df.assign(
+            Offset=df["Offline"] - df["Curve"],
+            Roll=df["Total Distance"] - df["Flat Carry"],
+        )
+    with timed("classify"):
+        df["Shot"] = shot_types(df, shot_limit)
+    return df
+
+
+def club_stats(df):
+    """Tidy (Club, Shot) table with every statistic the builders read."""
+    stats = df.groupby(["Club", "Shot"], sort=False, observed=True).agg(
+        **{
+            "Count": ("Shot", "size"),
+            "Median Carry": ("Flat Carry", "median"),
+            "Median Offline": ("Offline", "median"),
+            "Mean Offline": ("Offline", "mean"),
+            "Mean Roll": ("Roll", "mean"),
+            "Median Total": ("Total Distance", "median"),
+        }
+    )
+    counts = stats.groupby(level="Club", observed=True)["Count"]
+    stats["Pct"] = stats["Count"] / counts.transform("sum")
+    return stats
+
+
+def basic_shapes(fig):
+    fig.update_layout(shapes=SHAPES)
+    fig.add_trace(ORIGIN if isinstance(fig, PlainFigure) else go.Scatter(ORIGIN))
+    return fig
+
+
+def good_shots(fig, stats, good, visible, cloud_size=None):
+    try:
+        median_carry = stats.at["Good", "Median Carry"]
+    except KeyError:
+        return fig, 0
+
+    fig.add_trace(
+        new_trace(
+            fig,
+            "scatter",
+            meta="Carry Label",
+            x=[-18],
+            y=[0],
+            mode="text",
+            text=[f"{median_carry:.0f}m"],
+            visible=visible,
+            hoverinfo="skip",
+            showlegend=False,
+        )
+    )
+
+    median_offline = stats.at["Good", "Median Offline"]
+    fig.add_trace(
+        new_trace(
+            fig,
+            "scatter",
+            meta="Offline Line",
+            x=[median_offline, median_offline],
+            y=[-15, 15],
+            mode="lines",
+            visible=visible,
+            hoverinfo="skip",
+            showlegend=False,
+            line={
+                "dash": "dot",
+                "color": default_template()["layout"]["shapedefaults"]["line"]["color"],
+            },
+        )
+    )
+
+    fig.add_trace(
+        new_trace(
+            fig,
+            "scatter",
+            meta="Offline Label",
+            x=[median_offline],
+            y=[16],
+            mode="text",
+            text=[f"{median_offline:.0f}m"],
+            visible=visible,
+            hoverinfo="skip",
+            showlegend=False,
+        )
+    )
+
+    good_roll = stats.at["Good", "Mean Roll"]
+    fig.add_trace(
+        new_trace(
+            fig,
+            "scatter",
+            meta="Roll",
+            x=[0, 0],
+            y=[0, min(good_roll, 15)],
+            mode="lines",
+            line={"color": "red"},
+            visible=visible,
+            hoverinfo="text",
+            text=f"Roll: {good_roll:.0f}m",
+            showlegend=False,
+        )
+    )
+
+    fig.add_trace(shot_cloud(fig, good, median_carry, visible, cloud_size))
+
+    return fig, 5
+
+
+def shot_cloud(fig, good, median_carry, visible, cloud_size=None):
+    """Good shots as SVG markers, WebGL markers or a density heatmap.
+
+    The renderer follows the number of shots, or cloud_size when several
+    clouds must share one trace type.
+    """
+    if cloud_size is None:
+        cloud_size = len(good)
+    x = good["Offline"].to_numpy()
+    y = (good["Flat Carry"] - median_carry).to_numpy()
+
+    if cloud_size > DENSITY_THRESHOLD:
+        centers, counts, means = density_bins(
+            x, y, [good["Total Distance"], good["Flat Carry"]]
+        )
+        return new_trace(
+            fig,
+            "heatmap",
+            meta="Good Shots",
+            x=centers,
+            y=centers,
+            z=np.where(counts > 0, counts, np.nan).T,
+            customdata=np.stack([mean.T for mean in means], axis=-1),
+            colorscale=[[0, "#FFFFFF"], [1, SHOT_COLOR["Good"]]],
+            showscale=False,
+            name="",
+            hovertemplate=DENSITY_HOVER_TEMPLATE,
+            visible=visible,
+        )
+
+    return new_trace(
+        fig,
+        "scattergl" if cloud_size > SCATTERGL_THRESHOLD else "scatter",
+        meta="Good Shots",
+        x=x.tolist(),
+        y=y.tolist(),
+        mode="markers",
+        marker={"color": SHOT_COLOR["Good"]},
+        name="",
+        showlegend=False,
+        hovertemplate=HOVER_TEMPLATE,
+        customdata=np.stack((good["Total Distance"], good["Flat Carry"]), axis=1),
+        visible=visible,
+    )
+
+
+def density_bins(x, y, weights):
+    """Shot counts and per-bin means of weights on a square grid over the axes."""
+    extent = [-AXIS_RANGE, AXIS_RANGE]
+    bins = int(round(2 * AXIS_RANGE / DENSITY_BIN_SIZE))
+    counts, edges, _ = np.histogram2d(x, y, bins=bins, range=[extent, extent])
+
+    means = []
+    for weight in weights:
+        sums, _, _ = np.histogram2d(
+            x, y, bins=bins, range=[extent, extent], weights=weight
+        )
+        with np.errstate(invalid="ignore"):
+            means.append(sums / counts)
+
+    return (edges[:-1] + edges[1:]) / 2, counts, means
+
+
+def soft_shots(fig, stats, visible):
+    try:
+        median_carry = stats.at["Soft", "Median Carry"]
+        try:
+            good_carry = stats.at["Good", "Median Carry"]
+        except KeyError:
+            good_carry = median_carry
+    except KeyError:
+        return fig, 0
+
+    fig.add_trace(
+        new_trace(
+            fig,
+            "scatter",
+            meta="Soft Line",
+            x=[-15, 15],
+            y=[
+                median_carry - good_carry,
+                median_carry - good_carry,
+            ],
+            mode="lines",
+            visible=visible,
+            hoverinfo="skip",
+            showlegend=False,
+            line={"dash": "dot", "color": SHOT_COLOR["Soft"]},
+        )
+    )
+
+    fig.add_trace(
+        new_trace(
+            fig,
+            "scatter",
+            meta="Soft Label",
+            x=[-18],
+            y=[median_carry - good_carry],
+            mode="text",
+            text=[f"{median_carry:.0f}m"],
+            visible=visible,
+            hoverinfo="skip",
+            showlegend=False,
+        )
+    )
+
+    return fig, 2
+
+
+def bad_bar(fig, stats, visible):
+    shot_pct = stats["Pct"]
+    total_len = 30
+    num = 0
+
+    try:
+        miss_pct = shot_pct["Miss Hit"]
+    except KeyError:
+        miss_len = 0
+    else:
+        miss_len = miss_pct * total_len
+        fig.add_trace(
+            new_trace(
+                fig,
+                "scatter",
+                meta="Miss Hit",
+                x=[-15, miss_len - 15, miss_len - 15, -15],
+                y=[-23, -23, -18, -18],
+                fill="toself",
+                mode="none",
+                fillcolor=SHOT_COLOR["Miss Hit"],
+                hoveron="fills",
+                text=f"<b>Miss Hits</b> ({miss_pct:.0%})",
+                hoverinfo="text",
+                visible=visible,
+                showlegend=False,
+            )
+        )
+        num += 1
+
+    try:
+        flat_pct = shot_pct["Flat"]
+    except KeyError:
+        flat_len = 0
+    else:
+        flat_len = flat_pct * total_len
+        fig.add_trace(
+            new_trace(
+                fig,
+                "scatter",
+                meta="Flat",
+                x=[
+                    miss_len - 15,
+                    flat_len + miss_len - 15,
+                    flat_len + miss_len - 15,
+                    miss_len - 15,
+                ],
+                y=[-23, -23, -18, -18],
+                fill="toself",
+                mode="none",
+                fillcolor=SHOT_COLOR["Flat"],
+                hoveron="fills",
+                text=f"<b>Flat</b> ({flat_pct:.0%})",
+                hoverinfo="text",
+                visible=visible,
+                showlegend=False,
+            )
+        )
+        num += 1
+
+    return fig, num
+
+
+def good_bar(fig, stats, visible):
+    shot_pct = stats["Pct"]
+    total_len = 30
+    num = 0
+
+    try:
+        good_pct = shot_pct["Good"]
+    except KeyError:
+        good_pct = 0
+
+    try:
+        soft_pct = shot_pct["Soft"]
+    except KeyError:
+        soft_pct = 0
+
+    good_soft_len = (good_pct + soft_pct) * total_len / 2
+
+    if good_soft_len > 0:
+        fig.add_trace(
+            new_trace(
+                fig,
+                "scatter",
+                meta="Good",
+                x=[
+                    good_soft_len * -1,
+                    good_soft_len,
+                    good_soft_len,
+                    good_soft_len * -1,
+                ],
+                y=[23, 23, 18, 18],
+                fill="toself",
+                mode="none",
+                fillcolor=SHOT_COLOR["Good"],
+                hoveron="fills",
+                text=f"<b>Good</b> ({good_pct:.0%})<br><b>Soft</b> ({soft_pct:.0%})",
+                hoverinfo="text",
+                visible=visible,
+                showlegend=False,
+            )
+        )
+        num += 1
+
+    try:
+        fade_pct = shot_pct["Fade"]
+    except KeyError:
+        pass
+    else:
+        fade_carry = stats.at["Fade", "Median Carry"]
+        fade_offline = stats.at["Fade", "Mean Offline"]
+
+        fade_len = fade_pct * total_len
+        fig.add_trace(
+            new_trace(
+                fig,
+                "scatter",
+                meta="Fade",
+                x=[
+                    good_soft_len,
+                    good_soft_len + fade_len,
+                    good_soft_len + fade_len,
+                    good_soft_len,
+                ],
+                y=[23, 23, 18, 18],
+                fill="toself",
+                mode="none",
+                fillcolor=SHOT_COLOR["Fade"],
+                hoveron="fills",
+                text=f"<b>Fade</b> ({fade_pct:.0%})<br>Flat Carry: {fade_carry:.0f}m<br>Offline: {fade_offline:.0f}m",
+                hoverinfo="text",
+                visible=visible,
+                showlegend=False,
+            )
+        )
+        num += 1
+
+    try:
+        draw_pct = shot_pct["Draw"]
+    except KeyError:
+        pass
+    else:
+        draw_carry = stats.at["Draw", "Median Carry"]
+        draw_offline = stats.at["Draw", "Mean Offline"]
+
+        draw_len = draw_pct * total_len
+        fig.add_trace(
+            new_trace(
+                fig,
+                "scatter",
+                meta="Draw",
+                x=[
+                    -good_soft_len,
+                    -good_soft_len - draw_len,
+                    -good_soft_len - draw_len,
+                    -good_soft_len,
+                ],
+                y=[23, 23, 18, 18],
+                fill="toself",
+                mode="none",
+                fillcolor=SHOT_COLOR["Draw"],
+                hoveron="fills",
+                text=f"<b>Draw</b> ({draw_pct:.0%})<br>Flat Carry: {draw_carry:.0f}m<br>Offline: {draw_offline:.0f}m",
+                hoverinfo="text",
+                visible=visible,
+                showlegend=False,
+            )
+        )
+        num += 1
+
+    return fig, num
+
+
+def slice_bar(fig, stats, visible):
+    shot_pct = stats["Pct"]
+    total_len = 30
+    num = 0
+
+    try:
+        push_pct = shot_pct["Push"]
+    except KeyError:
+        push_len = 0
+    else:
+        push_len = push_pct * total_len
+        fig.add_trace(
+            new_trace(
+                fig,
+                "scatter",
+                meta="Push",
+                x=[23, 23, 18, 18],
+                y=[-15, push_len - 15, push_len - 15, -15],
+                fill="toself",
+                mode="none",
+                fillcolor=SHOT_COLOR["Push"],
+                hoveron="fills",
+                text=f"<b>Push</b> ({push_pct:.0%})",
+                hoverinfo="text",
+                visible=visible,
+                showlegend=False,
+            )
+        )
+        num += 1
+
+    try:
+        slice_pct = shot_pct["Slice"]
+    except KeyError:
+        slice_len = 0
+    else:
+        slice_len = slice_pct * total_len
+        fig.add_trace(
+            new_trace(
+                fig,
+                "scatter",
+                meta="Slice",
+                x=[23, 23, 18, 18],
+                y=[
+                    push_len - 15,
+                    slice_len + push_len - 15,
+                    slice_len + push_len - 15,
+                    push_len - 15,
+                ],
+                fill="toself",
+                mode="none",
+                fillcolor=SHOT_COLOR["Slice"],
+                hoveron="fills",
+                text=f"<b>Slice</b> ({slice_pct:.0%})",
+                hoverinfo="text",
+                visible=visible,
+                showlegend=False,
+            )
+        )
+        num += 1
+
+    try:
+        slice_push_pct = shot_pct["Slice/Push"]
+    except KeyError:
+        slice_push_len = 0
+    else:
+        slice_push_len = slice_push_pct * total_len
+        fig.add_trace(
+            new_trace(
+                fig,
+                "scatter",
+                meta="Slice/Push",
+                x=[23, 23, 18, 18],
+                y=[
+                    slice_len + push_len - 15,
+                    slice_push_len + slice_len + push_len - 15,
+                    slice_push_len + slice_len + push_len - 15,
+                    slice_len + push_len - 15,
+                ],
+                fill="toself",
+                mode="none",
+                fillcolor=SHOT_COLOR["Slice/Push"],
+                hoveron="fills",
+                text=f"<b>Slice/Push</b> ({slice_push_pct:.0%})",
+                hoverinfo="text",
+                visible=visible,
+                showlegend=False,
+            )
+        )
+        num += 1
+
+    return fig, num
+
+
+def hook_bar(fig, stats, visible):
+    shot_pct = stats["Pct"]
+    total_len = 30
+    num = 0
+
+    try:
+        pull_pct = shot_pct["Pull"]
+    except KeyError:
+        pull_len = 0
+    else:
+        pull_len = pull_pct * total_len
+        fig.add_trace(
+            new_trace(
+                fig,
+                "scatter",
+                meta="Pull",
+                x=[-23, -23, -18, -18],
+                y=[-15, pull_len - 15, pull_len - 15, -15],
+                fill="toself",
+                mode="none",
+                fillcolor=SHOT_COLOR["Pull"],
+                hoveron="fills",
+                text=f"<b>Pull</b> ({pull_pct:.0%})",
+                hoverinfo="text",
+                visible=visible,
+                showlegend=False,
+            )
+        )
+        num += 1
+
+    try:
+        hook_pct = shot_pct["Hook"]
+    except KeyError:
+        hook_len = 0
+    else:
+        hook_len = hook_pct * total_len
+        fig.add_trace(
+            new_trace(
+                fig,
+                "scatter",
+                meta="Hook",
+                x=[-23, -23, -18, -18],
+                y=[
+                    pull_len - 15,
+                    hook_len + pull_len - 15,
+                    hook_len + pull_len - 15,
+                    pull_len - 15,
+                ],
+                fill="toself",
+                mode="none",
+                fillcolor=SHOT_COLOR["Hook"],
+                hoveron="fills",
+                text=f"<b>Hook</b> ({hook_pct:.0%})",
+                hoverinfo="text",
+                visible=visible,
+                showlegend=False,
+            )
+        )
+        num += 1
+
+    try:
+        hook_pull_pct = shot_pct["Hook/Pull"]
+    except KeyError:
+        hook_pull_len = 0
+    else:
+        hook_pull_len = hook_pull_pct * total_len
+        fig.add_trace(
+            new_trace(
+                fig,
+                "scatter",
+                meta="Hook/Pull",
+                x=[-23, -23, -18, -18],
+                y=[
+                    hook_len + pull_len - 15,
+                    hook_pull_len + hook_len + pull_len - 15,
+                    hook_pull_len + hook_len + pull_len - 15,
+                    hook_len + pull_len - 15,
+                ],
+                fill="toself",
+                mode="none",
+                fillcolor=SHOT_COLOR["Hook/Pull"],
+                hoveron="fills",
+                text=f"<b>Hook/Pull</b> ({hook_pull_pct:.0%})",
+                hoverinfo="text",
+                visible=visible,
+                showlegend=False,
+            )
+        )
+        num += 1
+
+    return fig, num
+
+
+def prepare(df, shot_limit) -> BagData:
+    df = derive_columns(df, shot_limit)
+    with timed("aggregate"):
+        stats = club_stats(df)
+    return bag_data(df, stats)
+
+
+def bag_data(shots, stats) -> BagData:
+    """BagData of classified shots whose club_stats are already known."""
+    good = dict(
+        tuple(shots[shots["Shot"] == "Good"].groupby("Club", sort=False, observed=True))
+    )
+
+    played = set(stats.index.get_level_values("Club"))
+    clubs = [club for club in CLUB_ORDER if club in played]
+    return BagData(shots, stats, good, clubs)
+
+
+def split_clubs(bag) -> dict:
+    """BagData of each club on its own, all a club's figure needs of the bag."""
+    shots = dict(tuple(bag.shots.groupby("Club", sort=False, observed=True)))
+    stats = dict(tuple(bag.stats.groupby(level="Club", sort=False, observed=True)))
+    return {
+        club: BagData(
+            shots[club],
+            stats[club],
+            {club: bag.good[club]} if club in bag.good else {},
+            [club],
+        )
+        for club in bag.clubs
+    }
+
+
+def reclassify(bag, shot_limit, clubs) -> BagData:
+    """BagData with only the shots of the given clubs classified again.
+
+    The stats and good shots of every other club are reused as they are.
+    """
+    changed = bag.shots["Club"].isin(clubs).to_numpy()
+    if not changed.any():
+        return bag
+
+    with timed("classify"):
+        shot = bag.shots["Shot"].copy()
+        shot[changed] = shot_types(bag.shots[changed], shot_limit)
+        shots = bag.shots.assign(Shot=shot)
+    with timed("aggregate"):
+        kept = ~bag.stats.index.get_level_values("Club").isin(clubs)
+        stats = pd.concat([bag.stats[kept], club_stats(shots[changed])])
+        good = {club: df for club, df in bag.good.items() if club not in clubs}
+        changed_good = shots[changed & (shots["Shot"] == "Good").to_numpy()]
+        good.update(tuple(changed_good.groupby("Club", sort=False, observed=True)))
+    return BagData(shots, stats, good, bag.clubs)
+
+
+def add_club(fig, bag, club_name, visible, cloud_size=None):
+    club = bag.stats.loc[club_name]
+    total = 0
+
+    fig, num = good_shots(fig, club, bag.good.get(club_name), visible, cloud_size)
+    total += num
+
+    fig, num = soft_shots(fig, club, visible)
+    total += num
+
+    fig, num = bad_bar(fig, club, visible)
+    total += num
+
+    fig, num = good_bar(fig, club, visible)
+    total += num
+
+    fig, num = slice_bar(fig, club, visible)
+    total += num
+
+    fig, num = hook_bar(fig, club, visible)
+    total += num
+
+    return fig, total
+
+
+def update_axes(fig, title):
+    fig.update_layout(
+        xaxis=AXIS,
+        yaxis=AXIS,
+        width=1000,
+        height=1000,
+        title={"text": str(title)},
+        plot_bgcolor="#FFFFFF",
+    )
+    return fig
+
+
+def build_club_figure(bag, club_name, backend=FIGURE_BACKEND):
+    """Figure with the basic shapes and a single club's traces."""
+    fig = new_figure(backend)
+
+    fig = basic_shapes(fig)
+    with timed("builders"):
+        fig, _ = add_club(fig, bag, club_name, True)
+
+    with timed("layout"):
+        fig = update_axes(fig, club_name)
+    return observe_traces(fig)
+
+
+def club_payload(bags, backend=FIGURE_BACKEND):
+    """Static figure plus every bag's per-club traces, for dcc.Store.
+
+    The browser assembles a club's figure from this without calling the
+    server, see assets/shot_tracer.js.
+    """
+    fig = update_axes(basic_shapes(new_figure(backend)), "Approach")
+    payload = {"default_club": str(DEFAULT_CLUB), "figure": fig.to_plotly_json()}
+
+    payload["bags"] = {}
+    for golf_bag, bag in bags.items():
+        traces = {}
+        for club_name in bag.clubs:
+            club_fig, _ = add_club(new_figure(backend), bag, club_name, True)
+            traces[str(club_name)] = [trace_json(trace) for trace in club_fig.data]
+        payload["bags"][golf_bag] = {"clubs": list(traces), "traces": traces}
+
+    return payload
+
+
+def build_bag_figure(bag, backend=FIGURE_BACKEND):
+    clubs = bag.clubs
+    club_trace = []
+
+    fig = new_figure(backend)
+
+    fig = basic_shapes(fig)
+
+    with timed("builders"):
+        for club_name in clubs:
+            fig, num = add_club(fig, bag, club_name, club_name == DEFAULT_CLUB)
+            club_trace = club_trace + [club_name] * num
+
+    with timed("layout"):
+        fig = update_menu(fig, clubs, club_trace)
+        fig = update_axes(fig, "Approach")
+    return observe_traces(fig)
+
+
+def update_menu(fig, clubs, club_trace):
+    fig.update_layout(
+        updatemenus=[
+            {
+                "active": 7,
+                "buttons": list(
+                    [
+                        {
+                            "label": str(club),
+                            "args": [
+                                {
+                                    "visible": [True]
+                                    + [club_name == club for club_name in club_trace]
+                                },
+                                {"title": club, "showlegend": True},
+                            ],
+                        }
+                        for club in clubs
+                    ]
+                ),
+                "pad": {"r": 10, "t": 10},
+                "showactive": True,
+                "x": 0,
+                "xanchor": "left",
+                "y": 1.05,
+                "yanchor": "top",
+            }
+        ]
+    )
+    return fig
+
+
+def _as_list(value):
+    if value is None:
+        return []
+    if isinstance(value, str):
+        return [value]
+    return np.asarray(value).tolist()
+
+
+def merge_traces(traces):
+    """Restyle values of traces drawn as one, polygons split by None."""
+    if not traces:
+        return {"x": [], "y": [], "z": None, "text": None, "customdata": None}
+    if len(traces) == 1:
+        trace = traces[0]
+        restyle = {
+            "x": _as_list(trace["x"]),
+            "y": _as_list(trace["y"]),
+            "text": _prop(trace, "text"),
+        }
+        for attribute in ["z", "customdata"]:
+            value = _prop(trace, attribute)
+            restyle[attribute] = None if value is None else _as_list(value)
+        return restyle
+
+    merged = {"x": [], "y": [], "text": []}
+    for trace in traces:
+        x = _as_list(trace["x"])
+        text = _as_list(_prop(trace, "text"))
+        if merged["x"]:
+            for values in merged.values():
+                values.append(None)
+        merged["x"].extend(x)
+        merged["y"].extend(_as_list(trace["y"]))
+        merged["text"].extend(text + [None] * (len(x) - len(text)))
+    merged["z"] = None
+    merged["customdata"] = None
+    return merged
+
+
+def build_consolidated_figure(bag, backend=FIGURE_BACKEND):
+    """Same chart as build_bag_figure with one trace per TRACE_GROUPS entry.
+
+    Rather than one set of traces per club toggled with "visible", every
+    button of the club menu restyles the data of the shared traces.
+    """
+    clubs = bag.clubs
+    restyles = {}
+    templates = {}
+    # Every club's good shots share a trace, so they share its type too
+    cloud_size = max([len(good) for good in bag.good.values()], default=0)
+
+    with timed("builders"):
+        for club_name in clubs:
+            club_fig, _ = add_club(
+                new_figure(backend), bag, club_name, True, cloud_size
+            )
+            by_meta = {trace["meta"]: trace for trace in club_fig.data}
+            restyles[club_name] = {}
+            for group, metas in TRACE_GROUPS.items():
+                traces = [by_meta[meta] for meta in metas if meta in by_meta]
+                if traces:
+                    templates.setdefault(group, traces[0])
+                restyles[club_name][group] = merge_traces(traces)
+
+    groups = [group for group in TRACE_GROUPS if group in templates]
+    default = DEFAULT_CLUB if DEFAULT_CLUB in clubs else clubs[0]
+
+    fig = new_figure(backend)
+
+    fig = basic_shapes(fig)
+
+    for group in groups:
+        restyle = restyles[default][group]
+        trace = templates[group]
+        trace.update(
+            meta=group,
+            **{key: value for key, value in restyle.items() if value is not None},
+        )
+        fig.add_trace(trace)
+
+    indices = list(range(1, len(groups) + 1))
+
+    with timed("layout"):
+        fig.update_layout(
+            updatemenus=[
+                {
+                    "active": clubs.index(default),
+                    "buttons": [
+                        {
+                            "label": str(club),
+                            "method": "update",
+                            "args": [
+                                {
+                                    attribute: [
+                                        restyles[club][group][attribute]
+                                        for group in groups
+                                    ]
+                                    for attribute in RESTYLED
+                                },
+                                {"title": club, "showlegend": True},
+                                indices,
+                            ],
+                        }
+                        for club in clubs
+                    ],
+                    "pad": {"r": 10, "t": 10},
+                    "showactive": True,
+                    "x": 0,
+                    "xanchor": "left",
+                    "y": 1.05,
+                    "yanchor": "top",
+                }
+            ]
+        )
+        fig = update_axes(fig, "Approach")
+    return observe_traces(fig)
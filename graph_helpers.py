@@ -1,3 +1,4 @@
+import numpy as np
 import pandas as pd
 import plotly.express as px
 
@@ -207,6 +208,112 @@ def shot_type(shot: pd.Series, shot_limit: dict):
         return "Soft"
     return "Good"
 
+# Columns of the compiled limit table
+LIMIT_FIELDS = [
+    "Ball Speed",
+    "Launch Angle Min",
+    "Launch Angle Max",
+    "Height Min",
+    "Height Max",
+    "Straight",
+    "Curve",
+    "Offset",
+    "Offline",
+]
+
+def club_value(club):
+    """Club as in CLUB_ORDER, "7" and 7.0 become 7."""
+    if isinstance(club, str) and club.isdigit():
+        return int(club)
+    if isinstance(club, float) and club.is_integer():
+        return int(club)
+    return club
+
+def compile_limits(shot_limit: dict) -> np.ndarray:
+    """Dense LIMIT_FIELDS table with one row per club code of CLUB_DTYPE.
+
+    Rows of clubs without limits are NaN.
+    """
+
+    table = np.full((len(CLUB_ORDER), len(LIMIT_FIELDS)), np.nan)
+    for code, club in enumerate(CLUB_ORDER):
+        limit = shot_limit.get(club)
+        if limit is not None:
+            table[code] = [
+                limit["Ball Speed"],
+                *limit["Launch Angle"],
+                *limit["Height"],
+                limit["Straight"],
+                limit["Curve"],
+                limit["Offset"],
+                limit["Offline"],
+            ]
+    return table
+
+def shot_types(shots: pd.DataFrame, shot_limit: dict) -> pd.Series:
+    """Vectorized shot_type: classify every shot of the frame at once."""
+
+    codes = pd.Categorical(shots["Club"], dtype=CLUB_DTYPE).codes
+    table = compile_limits(shot_limit)
+    unknown = (codes < 0) | np.isnan(table[codes, 0])
+    if unknown.any():
+        raise KeyError(shots["Club"].iloc[unknown.argmax()])
+
+    limit = dict(zip(LIMIT_FIELDS, table[codes].T))
+
+    ball_speed = shots["Ball Speed"].to_numpy()
+    launch = shots["Launch Angle"].to_numpy()
+    height = shots["Height"].to_numpy()
+    curve = shots["Curve"].to_numpy()
+    offset = shots["Offset"].to_numpy()
+    offline = shots["Offline"].to_numpy()
+
+    # Same order as shot_type, np.select keeps the first matching condition
+    conditions = [
+        ball_speed < limit["Ball Speed"] - 2,
+        (height < limit["Height Min"]) | (launch < limit["Launch Angle Min"]),
+        (height > limit["Height Max"]) | (launch > limit["Launch Angle Max"]),
+        (curve < limit["Curve"] * -1) & (offset < limit["Offset"] * -1),
+        curve < limit["Curve"] * -1,
+        (curve > limit["Curve"]) & (offset > limit["Offset"]),
+        curve > limit["Curve"],
+        offset < limit["Offset"] * -1,
+        offset > limit["Offset"],
+        (limit["Straight"] * -1 > curve) & (curve > limit["Curve"] * -1),
+        (limit["Curve"] > curve) & (curve > limit["Straight"]),
+        offline < limit["Offline"] * -1,
+        offline > limit["Offline"],
+        ball_speed < limit["Ball Speed"],
+    ]
+    choices = [
+        "Miss Hit",
+        "Flat",
+        "Balloon",
+        "Hook/Pull",
+        "Hook",
+        "Slice/Push",
+        "Slice",
+        "Pull",
+        "Push",
+        "Draw",
+        "Fade",
+        "Hook/Pull",
+        "Slice/Push",
+        "Soft",
+    ]
+
+    return pd.Series(
+        pd.Categorical(np.select(conditions, choices, default="Good"), dtype=SHOT_DTYPE),
+        index=shots.index,
+        name="Shot",
+    )
+
 HOVER_TEMPLATE = "Total Distance: %{customdata[0]}m<br>Carry: %{customdata[1]}m<br>Offline: %{x}m"
 
+DENSITY_HOVER_TEMPLATE = "Shots: %{z}<br>Total Distance: %{customdata[0]:.0f}m<br>Carry: %{customdata[1]:.0f}m<br>Offline: %{x}m"
+
 CLUB_ORDER = ["Driver", "3Wood", "5Wood", 3, 4, 5, 6, 7, 8, 9, "PW", 46, 50, 52, "SW", 58, 60]
+
+CLUB_DTYPE = pd.CategoricalDtype(CLUB_ORDER, ordered=True)
+
+SHOT_DTYPE = pd.CategoricalDtype(list(SHOT_COLOR))
@@ -0,0 +1,261 @@
+import hashlib
+import json
+import logging
+import os
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import pandas as pd
+
+from config import EXCEL_ENGINE
+from graph_helpers import CLUB_ORDER
+
+try:
+    import pyarrow  # noqa: F401
+except ImportError:
+    HAS_ARROW = False
+else:
+    HAS_ARROW = True
+
+try:
+    import python_calamine  # noqa: F401
+except ImportError:
+    HAS_CALAMINE = False
+else:
+    HAS_CALAMINE = True
+
+logger = logging.getLogger(__name__)
+
+CACHE_DIR = ".cache"
+MANIFEST = "manifest.json"
+
+METRICS = [
+    "Ball Speed",
+    "Launch Angle",
+    "Height",
+    "Curve",
+    "Offline",
+    "Flat Carry",
+    "Total Distance",
+]
+REQUIRED_COLUMNS = ["Club", *METRICS]
+# Club holds both "Driver" and 7, metrics may be blank
+DTYPES = {"Club": "object", **{metric: "float64" for metric in METRICS}}
+# A cache written with other columns or dtypes is parsed again
+SCHEMA = {"columns": REQUIRED_COLUMNS, "dtypes": DTYPES}
+
+
+def file_hash(path) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _cache_dir(path: Path, cache_dir=None) -> Path:
+    if cache_dir is None:
+        cache_dir = path.parent / CACHE_DIR
+    return Path(cache_dir) / path.stem
+
+
+def _read_manifest(cache: Path) -> dict:
+    try:
+        with open(cache / MANIFEST) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _replace(file: Path, write):
+    """Call write with a temp file of its own beside file, then move it over.
+
+    Processes loading the same workbook each write their own temp file, and
+    readers only ever see a whole file.
+    """
+    fd, tmp = tempfile.mkstemp(dir=file.parent, prefix=f".{file.name}.")
+    os.close(fd)
+    try:
+        write(tmp)
+        os.replace(tmp, file)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+
+
+def _write_manifest(cache: Path, manifest: dict):
+    def write(tmp):
+        with open(tmp, "w") as f:
+            json.dump(manifest, f, indent=2)
+
+    _replace(cache / MANIFEST, write)
+
+
+def _mixed_columns(df: pd.DataFrame) -> list:
+    # Arrow needs one type per column, "Club" holds both "Driver" and 7
+    return [
+        col
+        for col in df.columns
+        if df[col].dtype == object and df[col].dropna().map(type).nunique() > 1
+    ]
+
+
+def _restore_mixed(value):
+    if isinstance(value, str) and value.isdigit():
+        return int(value)
+    return value
+
+
+def _write_sheet(df: pd.DataFrame, file: Path) -> list:
+    mixed = _mixed_columns(df)
+    df = df.reset_index(drop=True)
+    for col in mixed:
+        df[col] = df[col].map(lambda x: x if pd.isna(x) else str(x))
+    _replace(file, df.to_feather)
+    return mixed
+
+
+def _read_sheet(file: Path, mixed: list) -> pd.DataFrame:
+    df = pd.read_feather(file)
+    for col in mixed:
+        df[col] = df[col].map(_restore_mixed).astype(object)
+    return df
+
+
+def _is_fresh(manifest: dict, path: Path, stat: os.stat_result) -> bool:
+    if not manifest or manifest.get("schema") != SCHEMA:
+        return False
+    if (manifest["mtime_ns"], manifest["size"]) == (stat.st_mtime_ns, stat.st_size):
+        return True
+    # Touched but maybe not changed, fall back on the content hash
+    return manifest["sha256"] == file_hash(path)
+
+
+def _is_required(column) -> bool:
+    return column in REQUIRED_COLUMNS
+
+
+def read_workbook(path, sheet_name=None, engine=None):
+    """Parse only the REQUIRED_COLUMNS of the workbook's sheets.
+
+    The engine defaults to EXCEL_ENGINE, then to calamine when installed.
+    """
+    if engine is None:
+        engine = EXCEL_ENGINE or ("calamine" if HAS_CALAMINE else "openpyxl")
+    return pd.read_excel(
+        path,
+        sheet_name=sheet_name,
+        engine=engine,
+        usecols=_is_required,
+        dtype=DTYPES,
+    )
+
+
+def load_workbook(path, sheet_name=None, cache_dir=None) -> dict:
+    """Read every sheet of the workbook, going through a Feather cache.
+
+    The first load parses the workbook with read_workbook and writes one
+    Feather file per sheet. Later loads read the Feather files as long as
+    the workbook's mtime and size, or failing that its content hash, are
+    unchanged.
+    """
+    path = Path(path)
+    if not HAS_ARROW:
+        return read_workbook(path, sheet_name=sheet_name or None)
+
+    cache = _cache_dir(path, cache_dir)
+    manifest = _read_manifest(cache)
+    stat = path.stat()
+
+    if not _is_fresh(manifest, path, stat):
+        cache.mkdir(parents=True, exist_ok=True)
+        sheets = read_workbook(path)
+        manifest = {"sha256": file_hash(path), "schema": SCHEMA, "sheets": {}}
+        for i, (name, df) in enumerate(sheets.items()):
+            file = f"{i}.feather"
+            mixed = _write_sheet(df, cache / file)
+            manifest["sheets"][name] = {"file": file, "mixed": mixed}
+
+    if (manifest.get("mtime_ns"), manifest.get("size")) != (
+        stat.st_mtime_ns,
+        stat.st_size,
+    ):
+        manifest.update(mtime_ns=stat.st_mtime_ns, size=stat.st_size)
+        _write_manifest(cache, manifest)
+
+    if sheet_name is None:
+        sheet_name = list(manifest["sheets"])
+    if isinstance(sheet_name, str):
+        sheet = manifest["sheets"][sheet_name]
+        return _read_sheet(cache / sheet["file"], sheet["mixed"])
+
+    return {
+        name: _read_sheet(
+            cache / manifest["sheets"][name]["file"],
+            manifest["sheets"][name]["mixed"],
+        )
+        for name in sheet_name
+    }
+
+
+def discover_workbooks(data_dir) -> list:
+    """Workbooks of a data directory, without Excel's ~$ lock files."""
+    return sorted(
+        path for path in Path(data_dir).glob("*.xlsx") if not path.name.startswith("~$")
+    )
+
+
+def missing_columns(df) -> list:
+    return [col for col in REQUIRED_COLUMNS if col not in df.columns]
+
+
+def unknown_clubs(df) -> pd.Series:
+    """Mask of the shots whose club is blank or not in CLUB_ORDER."""
+    return ~df["Club"].isin(CLUB_ORDER)
+
+
+def load_bags(path, processes=None) -> dict:
+    """Every valid sheet of a workbook, or of all workbooks of a directory.
+
+    Workbooks are parsed concurrently in a process pool. Bags are named
+    after their sheet, prefixed with the workbook's name when there are
+    several workbooks. Sheets lacking any of REQUIRED_COLUMNS are skipped,
+    and so are shots of unknown clubs, so one sheet cannot fail the others.
+    """
+    path = Path(path)
+    workbooks = discover_workbooks(path) if path.is_dir() else [path]
+
+    if len(workbooks) > 1 and processes != 1:
+        with ProcessPoolExecutor(max_workers=processes) as pool:
+            sheets = list(pool.map(load_workbook, workbooks))
+    else:
+        sheets = [load_workbook(workbook) for workbook in workbooks]
+
+    bags = {}
+    for workbook, frames in zip(workbooks, sheets):
+        for sheet, df in frames.items():
+            missing = missing_columns(df)
+            if missing:
+                logger.warning(
+                    "Skipping sheet %s of %s, missing columns %s",
+                    sheet,
+                    workbook,
+                    missing,
+                )
+                continue
+            unknown = unknown_clubs(df)
+            if unknown.any():
+                logger.warning(
+                    "Skipping %d shots of sheet %s of %s, unknown clubs %s",
+                    unknown.sum(),
+                    sheet,
+                    workbook,
+                    sorted(df.loc[unknown, "Club"].astype(str).unique()),
+                )
+                df = df[~unknown].reset_index(drop=True)
+            if df.empty:
+                logger.warning("Skipping sheet %s of %s, no shots", sheet, workbook)
+                continue
+            bags[sheet if len(workbooks) == 1 else f"{workbook.stem}/{sheet}"] = df
+    return bags
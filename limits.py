@@ -0,0 +1,77 @@
+"""Shot limits kept in a JSON file, edited while the app runs.
+
+python limits.py export limits.json
+
+Limits under "bags", by bag name, replace the shared limits of their clubs
+for that bag only.
+"""
+
+import argparse
+import json
+import os
+
+from graph_helpers import MANUAL_SHOT_LIMITS, club_value
+
+# Key of the per-bag limits in the file
+BAGS = "bags"
+
+
+def _club_limits(limits: dict) -> dict:
+    return {
+        club_value(club): {
+            field: tuple(value) if isinstance(value, list) else value
+            for field, value in limit.items()
+        }
+        for club, limit in limits.items()
+    }
+
+
+def load_limits(path, golf_bag=None) -> dict:
+    """Limits by club as in MANUAL_SHOT_LIMITS, ranges as tuples.
+
+    The shared limits, or golf_bag's when it has its own in the file.
+    """
+    with open(path) as f:
+        limits = json.load(f)
+    bags = limits.pop(BAGS, {})
+    return _club_limits({**limits, **bags.get(golf_bag, {})})
+
+
+def load_bag_limits(path) -> dict:
+    """load_limits of every bag with its own limits in the file, by bag."""
+    with open(path) as f:
+        limits = json.load(f)
+    bags = limits.pop(BAGS, {})
+    return {golf_bag: _club_limits({**limits, **own}) for golf_bag, own in bags.items()}
+
+
+def _json(shot_limit: dict) -> dict:
+    return {str(club): limit for club, limit in shot_limit.items()}
+
+
+def save_limits(shot_limit: dict, path, bag_limits=None):
+    """Write shot_limit, and the limits of each bag in bag_limits under BAGS."""
+    limits = _json(shot_limit)
+    if bag_limits:
+        limits[BAGS] = {
+            golf_bag: _json(limit) for golf_bag, limit in bag_limits.items()
+        }
+    tmp = f"{path}.tmp"
+    with open(tmp, "w") as f:
+        json.dump(limits, f, indent=2)
+    os.replace(tmp, path)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    commands = parser.add_subparsers(dest="command", required=True)
+    export = commands.add_parser("export", help="write MANUAL_SHOT_LIMITS to a file")
+    export.add_argument("path")
+    args = parser.parse_args(argv)
+
+    save_limits(MANUAL_SHOT_LIMITS, args.path)
+    print(f"{len(MANUAL_SHOT_LIMITS)} clubs written to {args.path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,146 @@
+import bisect
+import contextlib
+import threading
+import time
+
+from config import METRICS_ENABLED
+
+SECONDS_BUCKETS = (
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1,
+    2.5,
+    5,
+    10,
+)
+TRACE_BUCKETS = (1, 5, 10, 25, 50, 100, 250, 500, 1000)
+BYTES_BUCKETS = (1e3, 1e4, 5e4, 1e5, 2.5e5, 5e5, 1e6, 5e6, 1e7)
+
+_NOT_TIMED = contextlib.nullcontext()
+
+
+class Histogram:
+    def __init__(self, name, description, buckets):
+        self.name = name
+        self.description = description
+        self.buckets = buckets
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value, **labels):
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [[0] * len(self.buckets), 0.0, 0]
+            index = bisect.bisect_left(self.buckets, value)
+            if index < len(self.buckets):
+                series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    def render(self):
+        lines = [
+            f"# HELP {self.name} {self.description}",
+            f"# TYPE {self.name} histogram",
+        ]
+        with self._lock:
+            series = sorted(self._series.items())
+            for key, (counts, total, count) in series:
+                labels = [f'{name}="{value}"' for name, value in key]
+                cumulative = 0
+                for bound, bucket in zip(self.buckets, counts):
+                    cumulative += bucket
+                    le = ",".join([*labels, f'le="{bound:g}"'])
+                    lines.append(f"{self.name}_bucket{{{le}}} {cumulative}")
+                le = ",".join([*labels, 'le="+Inf"'])
+                lines.append(f"{self.name}_bucket{{{le}}} {count}")
+                suffix = "{" + ",".join(labels) + "}" if labels else ""
+                lines.append(f"{self.name}_sum{suffix} {total:g}")
+                lines.append(f"{self.name}_count{suffix} {count}")
+        return "\n".join(lines)
+
+
+STAGE_SECONDS = Histogram(
+    "topyardage_stage_seconds", "Time spent in each stage.", SECONDS_BUCKETS
+)
+FIGURE_TRACES = Histogram(
+    "topyardage_figure_traces", "Number of traces per built figure.", TRACE_BUCKETS
+)
+RESPONSE_BYTES = Histogram(
+    "topyardage_response_bytes", "Size of callback responses.", BYTES_BUCKETS
+)
+HISTOGRAMS = [STAGE_SECONDS, FIGURE_TRACES, RESPONSE_BYTES]
+
+
+@contextlib.contextmanager
+def _timer(stage):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        STAGE_SECONDS.observe(time.perf_counter() - start, stage=stage)
+
+
+def timed(stage):
+    """Context manager timing a stage, a shared no-op when metrics are off."""
+    if not METRICS_ENABLED:
+        return _NOT_TIMED
+    return _timer(stage)
+
+
+def observe_traces(fig):
+    if METRICS_ENABLED:
+        FIGURE_TRACES.observe(len(fig.data))
+    return fig
+
+
+def _samples(kind, metrics):
+    return [
+        f"# HELP {name} {description}\n# TYPE {name} {kind}\n{name} {value}"
+        for name, (description, value) in (metrics or {}).items()
+    ]
+
+
+def render(gauges=None, counters=None):
+    """Every metric in the Prometheus text exposition format.
+
+    gauges and counters map a metric's name to its description and value,
+    the names of counters end in _total.
+    """
+    parts = [histogram.render() for histogram in HISTOGRAMS]
+    parts += _samples("gauge", gauges)
+    parts += _samples("counter", counters)
+    return "\n".join(parts) + "\n"
+
+
+def instrument(server, gauges=lambda: {}, counters=lambda: {}):
+    """Record response sizes and request time, and serve /metrics."""
+    from flask import Response, g, request
+
+    @server.before_request
+    def start_timer():
+        g.metrics_start = time.perf_counter()
+
+    @server.after_request
+    def record_response(response):
+        if request.path.endswith("_dash-update-component"):
+            STAGE_SECONDS.observe(
+                time.perf_counter() - g.metrics_start, stage="request"
+            )
+            if not response.direct_passthrough:
+                RESPONSE_BYTES.observe(len(response.get_data()), path=request.path)
+        return response
+
+    @server.route("/metrics")
+    def metrics():
+        return Response(
+            render(gauges(), counters()), mimetype="text/plain; version=0.0.4"
+        )
@@ -0,0 +1,93 @@
+"""Figures as plain dicts, built and encoded without plotly's validators."""
+
+import functools
+
+import numpy as np
+
+try:
+    import orjson
+except ImportError:
+    HAS_ORJSON = False
+else:
+    HAS_ORJSON = True
+
+# JSON of the values every figure shares, by id, see static()
+_FRAGMENTS = {}
+
+
+def _dumps(value) -> bytes:
+    if HAS_ORJSON:
+        return orjson.dumps(
+            value, option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+        )
+    from plotly.io.json import to_json_plotly
+
+    return to_json_plotly(value).encode()
+
+
+def static(value):
+    """Encode a module-level constant once, encode() reuses its JSON.
+
+    value must not be mutated afterwards.
+    """
+    _FRAGMENTS[id(value)] = _dumps(value)
+    return value
+
+
+def encode(value) -> bytes:
+    fragment = _FRAGMENTS.get(id(value))
+    return _dumps(value) if fragment is None else fragment
+
+
+@functools.cache
+def default_template() -> dict:
+    """Plotly's default template, as go.Figure puts it in its layout."""
+    import plotly.graph_objects as go
+
+    return static(go.Figure().to_plotly_json()["layout"]["template"])
+
+
+def plain_trace(trace_type, **props) -> dict:
+    # orjson only encodes C-contiguous arrays, others would make Dash fall
+    # back to cleaning the whole response
+    for key, value in props.items():
+        if isinstance(value, np.ndarray):
+            props[key] = np.ascontiguousarray(value)
+    return {"type": trace_type, **props}
+
+
+class PlainFigure(dict):
+    """The part of go.Figure the builders use, over a plain dict.
+
+    Traces are dicts and nothing is validated. Dash and plotly encode it
+    like the dict it is, and encode() reuses the JSON of static() values.
+    """
+
+    def __init__(self):
+        super().__init__(data=[], layout={"template": default_template()})
+
+    @property
+    def data(self) -> list:
+        return self["data"]
+
+    @property
+    def layout(self) -> dict:
+        return self["layout"]
+
+    def add_trace(self, trace):
+        self.data.append(trace)
+        return self
+
+    def update_layout(self, **layout):
+        self.layout.update(layout)
+        return self
+
+    def to_plotly_json(self):
+        return self
+
+    def encode(self) -> bytes:
+        layout = b",".join(
+            encode(key) + b":" + encode(value) for key, value in self.layout.items()
+        )
+        data = b",".join(encode(trace) for trace in self.data)
+        return b'{"data":[' + data + b'],"layout":{' + layout + b"}}"
@@ -0,0 +1,100 @@
+"""Which club to hit for a target distance, from a bag's own shots.
+
+index = ClubIndex.from_bag(bag)
+index.recommend([137, 152, 94], tolerance=5)
+"""
+
+import numpy as np
+import pandas as pd
+
+# Query names of the distances a target can be played to
+METRICS = {"carry": "Flat Carry", "total": "Total Distance"}
+
+# Metres either side of the target a shot still counts as on it
+DEFAULT_TOLERANCE = 5
+
+# Shots left out of the distributions, contact failures rather than swings
+# a player plans for
+EXCLUDED_SHOTS = ("Miss Hit", "Flat")
+
+
+class ClubIndex:
+    """Each club's carries and total distances, sorted.
+
+    The share of a club's shots within tolerance of a target is two binary
+    searches in its sorted distances, done for every target at once.
+    """
+
+    def __init__(self, distances: dict):
+        """distances is {club: {metric: values}}, clubs in bag order."""
+        self.clubs = list(distances)
+        self.distances = {
+            metric: [
+                np.sort(np.asarray(distances[club][metric])) for club in self.clubs
+            ]
+            for metric in METRICS.values()
+        }
+
+    @classmethod
+    def from_bag(cls, bag, exclude=EXCLUDED_SHOTS):
+        shots = bag.shots[~bag.shots["Shot"].isin(exclude)]
+        distances = {}
+        for club, group in shots.groupby("Club", sort=False, observed=True):
+            distances[club] = {
+                metric: group[metric].dropna().to_numpy() for metric in METRICS.values()
+            }
+        return cls({club: distances[club] for club in bag.clubs if club in distances})
+
+    def shots(self, metric="carry") -> np.ndarray:
+        return np.array([len(values) for values in self.distances[METRICS[metric]]])
+
+    def percentiles(self, q=(10, 25, 50, 75, 90), metric="carry") -> pd.DataFrame:
+        """Empirical percentiles of every club's distances, one row per club."""
+        return pd.DataFrame(
+            [np.percentile(values, q) for values in self.distances[METRICS[metric]]],
+            index=pd.Index(self.clubs, name="Club"),
+            columns=[f"P{p}" for p in q],
+        )
+
+    def probabilities(self, targets, tolerance=DEFAULT_TOLERANCE, metric="carry"):
+        """(targets, clubs) shares of each club's shots within tolerance."""
+        targets = np.asarray(targets, dtype="float64")
+        probabilities = np.zeros((len(targets), len(self.clubs)))
+        for i, values in enumerate(self.distances[METRICS[metric]]):
+            if len(values):
+                low = np.searchsorted(values, targets - tolerance, side="left")
+                high = np.searchsorted(values, targets + tolerance, side="right")
+                probabilities[:, i] = (high - low) / len(values)
+        return probabilities
+
+    def recommend(self, targets, tolerance=DEFAULT_TOLERANCE, metric="carry"):
+        """Most likely club to land within tolerance of each target.
+
+        Among clubs equally likely, or when none gets there, the one whose
+        median is closest to the target.
+        """
+        if not self.shots(metric).any():
+            raise ValueError("No shots to recommend a club from")
+        targets = np.asarray(targets, dtype="float64")
+        probabilities = self.probabilities(targets, tolerance, metric)
+        medians = np.array(
+            [
+                np.median(values) if len(values) else np.nan
+                for values in self.distances[METRICS[metric]]
+            ]
+        )
+        gaps = np.abs(medians[np.newaxis, :] - targets[:, np.newaxis])
+        likeliest = probabilities == probabilities.max(axis=1, keepdims=True)
+        best = np.where(likeliest, np.nan_to_num(gaps, nan=np.inf), np.inf).argmin(
+            axis=1
+        )
+
+        rows = np.arange(len(targets))
+        return pd.DataFrame(
+            {
+                "Target": targets,
+                "Club": np.array(self.clubs, dtype=object)[best],
+                "Probability": probabilities[rows, best],
+                "Median": medians[best],
+            }
+        )
@@ -0,0 +1,91 @@
+"""Figure responses compressed once per version and revalidated with ETags."""
+
+import functools
+import gzip
+import hashlib
+from pathlib import Path
+
+from config import (
+    DEFAULT_CLUB,
+    DENSITY_BIN_SIZE,
+    DENSITY_THRESHOLD,
+    FIGURE_BACKEND,
+    RENDER_MODE,
+    SCATTERGL_THRESHOLD,
+)
+
+try:
+    import brotli
+except ImportError:
+    HAS_BROTLI = False
+else:
+    HAS_BROTLI = True
+
+# Content codings the bodies are precompressed in, by preference
+ENCODINGS = ("br", "gzip") if HAS_BROTLI else ("gzip",)
+
+# Modules the figures are built by, a change to any of them changes the bodies
+FIGURE_MODULES = ("figures.py", "graph_helpers.py", "plain_figure.py")
+
+
+@functools.cache
+def build_version() -> str:
+    """Version of the code and settings behind a body, beyond its key's data."""
+    import plotly
+
+    sources = [(Path(__file__).parent / name).read_bytes() for name in FIGURE_MODULES]
+    settings = (
+        RENDER_MODE,
+        FIGURE_BACKEND,
+        DEFAULT_CLUB,
+        SCATTERGL_THRESHOLD,
+        DENSITY_THRESHOLD,
+        DENSITY_BIN_SIZE,
+    )
+    built = repr((sources, plotly.__version__, settings)).encode()
+    return hashlib.sha1(built).hexdigest()[:16]
+
+
+def etag(key) -> str:
+    """Strong ETag of the body identified by key, which holds its versions."""
+    return hashlib.sha1(repr((build_version(), key)).encode()).hexdigest()[:16]
+
+
+def encode(body: bytes) -> dict:
+    """body in every coding of ENCODINGS, and as is under "identity"."""
+    bodies = {"identity": body, "gzip": gzip.compress(body, 9, mtime=0)}
+    if HAS_BROTLI:
+        bodies["br"] = brotli.compress(body)
+    return bodies
+
+
+def negotiate(accept_encodings) -> str:
+    for encoding in ENCODINGS:
+        if accept_encodings.quality(encoding) > 0:
+            return encoding
+    return "identity"
+
+
+def cached_response(key, body, cache, max_age=0):
+    """Response of the request being served, 304 when the client has it.
+
+    body() returns the JSON bytes identified by key, it is only called and
+    compressed when cache does not hold them yet. A matching If-None-Match
+    is answered before any of that.
+    """
+    from flask import Response, request
+
+    encoding = negotiate(request.accept_encodings)
+    tag = etag(key) if encoding == "identity" else f"{etag(key)}-{encoding}"
+    headers = {
+        "ETag": f'"{tag}"',
+        "Cache-Control": f"public, max-age={max_age}, must-revalidate",
+        "Vary": "Accept-Encoding",
+    }
+    if request.if_none_match.contains_weak(tag):
+        return Response(status=304, headers=headers)
+
+    bodies = cache.get_or_build(key, lambda: encode(body()))
+    if encoding != "identity":
+        headers["Content-Encoding"] = encoding
+    return Response(bodies[encoding], mimetype="application/json", headers=headers)
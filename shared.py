@@ -0,0 +1,195 @@
+"""Snapshots shared by every worker process through memory-mapped Arrow files.
+
+Layout of the shared directory:
+    CURRENT                      pointer to the published version
+    <version>/manifest.json      bags and data versions of the snapshot
+    <version>/<i>.shots.arrow    enriched shots of the i-th bag
+    <version>/<i>.stats.arrow    its club_stats
+"""
+
+import contextlib
+import fcntl
+import hashlib
+import json
+import logging
+import os
+import shutil
+from pathlib import Path
+from types import MappingProxyType
+
+import pandas as pd
+
+from cache import limits_version
+from dataset import Snapshot
+from datastore import _file_state
+from figures import bag_data
+from graph_helpers import CLUB_DTYPE, SHOT_DTYPE
+
+logger = logging.getLogger(__name__)
+
+POINTER = "CURRENT"
+LOCK = ".lock"
+MANIFEST = "manifest.json"
+# Arrow dictionaries hold one type and "Club" mixes "Driver" and 7, the
+# categoricals are stored as their codes
+CATEGORICAL = {"Club": CLUB_DTYPE, "Shot": SHOT_DTYPE}
+
+
+def _write_table(df: pd.DataFrame, file: Path):
+    import pyarrow as pa
+
+    columns = {
+        col: (
+            df[col].astype(CATEGORICAL[col]).cat.codes
+            if col in CATEGORICAL
+            else df[col]
+        )
+        for col in df.columns
+    }
+    table = pa.Table.from_pandas(pd.DataFrame(columns), preserve_index=False)
+    with pa.OSFile(str(file), "wb") as sink:
+        with pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+
+
+def _read_table(file: Path) -> pd.DataFrame:
+    """Frame whose numeric columns are views of the mapped file."""
+    import pyarrow as pa
+
+    table = pa.ipc.open_file(pa.memory_map(str(file))).read_all().combine_chunks()
+    columns = {}
+    for name, column in zip(table.column_names, table.columns):
+        values = column.to_numpy()
+        if name in CATEGORICAL:
+            values = pd.Categorical.from_codes(values, dtype=CATEGORICAL[name])
+        columns[name] = values
+    # Not consolidated into blocks, which would copy the columns
+    return pd.DataFrame(columns, copy=False)
+
+
+def _json(value):
+    return json.loads(json.dumps(value))
+
+
+class SharedData:
+    """Directory holding the published snapshot, see the module docstring.
+
+    Versions are written next to each other and CURRENT is swapped
+    atomically, so a worker attaching mid-publish reads either version
+    whole. Publishing takes lock(), only one worker writes at a time.
+    """
+
+    def __init__(self, directory):
+        self.directory = Path(directory)
+
+    @contextlib.contextmanager
+    def lock(self):
+        self.directory.mkdir(parents=True, exist_ok=True)
+        with open(self.directory / LOCK, "w") as f:
+            fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+    def pointer(self) -> dict:
+        try:
+            with open(self.directory / POINTER) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def publish(self, snapshot: Snapshot, source=None):
+        """Write snapshot unless already there and point CURRENT at it.
+
+        source identifies what it was loaded from. Call within lock().
+        """
+        previous = self.pointer()
+        name = hashlib.sha1(snapshot.version.encode()).hexdigest()[:16]
+        target = self.directory / name
+        if not target.exists():
+            tmp = self.directory / f".{name}.tmp"
+            shutil.rmtree(tmp, ignore_errors=True)
+            tmp.mkdir(parents=True)
+            manifest = {"bags": []}
+            for i, (golf_bag, bag) in enumerate(snapshot.bags.items()):
+                _write_table(bag.shots, tmp / f"{i}.shots.arrow")
+                _write_table(bag.stats.reset_index(), tmp / f"{i}.stats.arrow")
+                manifest["bags"].append(
+                    {
+                        "name": golf_bag,
+                        "data_version": snapshot.data_versions[golf_bag],
+                        "limits_version": snapshot.bag_limits[golf_bag],
+                        # Pairs, JSON keys would turn club 7 into "7"
+                        "club_limits": list(snapshot.club_limits[golf_bag].items()),
+                        "file": i,
+                    }
+                )
+            with open(tmp / MANIFEST, "w") as f:
+                json.dump(manifest, f, indent=2)
+            os.replace(tmp, target)
+
+        tmp = self.directory / f"{POINTER}.tmp"
+        with open(tmp, "w") as f:
+            json.dump({"version": name, "source": source}, f)
+        os.replace(tmp, self.directory / POINTER)
+        logger.info("Published shared data version %s", name)
+
+        # Workers still mapping a removed version keep their mapping
+        keep = {name, previous and previous["version"]}
+        for path in self.directory.iterdir():
+            if path.is_dir() and path.name not in keep:
+                shutil.rmtree(path, ignore_errors=True)
+
+    def attach(self) -> Snapshot:
+        """Snapshot of the published version, None before the first publish."""
+        pointer = self.pointer()
+        if pointer is None:
+            return None
+        version = self.directory / pointer["version"]
+        with open(version / MANIFEST) as f:
+            manifest = json.load(f)
+
+        bags = {}
+        data_versions = {}
+        bag_limits = {}
+        club_limits = {}
+        for bag in manifest["bags"]:
+            shots = _read_table(version / f"{bag['file']}.shots.arrow")
+            stats = _read_table(version / f"{bag['file']}.stats.arrow")
+            bags[bag["name"]] = bag_data(shots, stats.set_index(["Club", "Shot"]))
+            data_versions[bag["name"]] = bag["data_version"]
+            bag_limits[bag["name"]] = bag["limits_version"]
+            club_limits[bag["name"]] = MappingProxyType(dict(bag["club_limits"]))
+
+        return Snapshot(
+            bags=MappingProxyType(bags),
+            data_versions=MappingProxyType(data_versions),
+            bag_limits=MappingProxyType(bag_limits),
+            club_limits=MappingProxyType(club_limits),
+        )
+
+
+def load_shared(
+    shared: SharedData, path, shot_limit: dict, load, bag_limits=None
+) -> Snapshot:
+    """Snapshot of the data at path, loaded once for every worker.
+
+    The first worker to see a new state of path, or new limits, runs load()
+    and publishes its snapshot, the others attach to it.
+    """
+    source = _json(
+        {
+            "data": _file_state(path),
+            "limits": limits_version(shot_limit),
+            "bag_limits": {
+                golf_bag: limits_version(limit)
+                for golf_bag, limit in (bag_limits or {}).items()
+            },
+        }
+    )
+    with shared.lock():
+        pointer = shared.pointer()
+        if pointer is None or pointer["source"] != source:
+            shared.publish(load(), source)
+        return shared.attach()
@@ -0,0 +1,420 @@
+"""Append-only SQLite store of classified range sessions.
+
+python shot_store.py shots.db import PdH "Topgolf export.csv"
+python shot_store.py shots.db import-workbook "data/Golf Range.xlsx"
+"""
+
+import argparse
+import hashlib
+import sqlite3
+from contextlib import closing
+from datetime import datetime, timezone
+
+import numpy as np
+import pandas as pd
+
+from calibration import club_sketches, sketch_counts
+from cache import limits_version
+from config import LIMITS_PATH
+from graph_helpers import MANUAL_SHOT_LIMITS, club_value, shot_types
+from ingest import METRICS
+from limits import load_limits
+
+# Metrics whose per-club medians are kept as value histograms
+MEDIANS = {
+    "Flat Carry": "Median Carry",
+    "Offline": "Median Offline",
+    "Total Distance": "Median Total",
+}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    bag TEXT NOT NULL,
+    session TEXT NOT NULL,
+    imported_at TEXT NOT NULL,
+    shots INTEGER NOT NULL,
+    limits TEXT NOT NULL,
+    PRIMARY KEY (bag, session)
+);
+CREATE TABLE IF NOT EXISTS shots (
+    bag TEXT NOT NULL,
+    session TEXT NOT NULL,
+    "Club" TEXT NOT NULL,
+    "Ball Speed" REAL,
+    "Launch Angle" REAL,
+    "Height" REAL,
+    "Curve" REAL,
+    "Offline" REAL,
+    "Flat Carry" REAL,
+    "Total Distance" REAL,
+    "Shot" TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS shots_bag ON shots (bag);
+CREATE TABLE IF NOT EXISTS club_stats (
+    bag TEXT NOT NULL,
+    club TEXT NOT NULL,
+    shot TEXT NOT NULL,
+    count INTEGER NOT NULL,
+    sum_offline REAL NOT NULL,
+    sum_roll REAL NOT NULL,
+    PRIMARY KEY (bag, club, shot)
+);
+CREATE TABLE IF NOT EXISTS club_histograms (
+    bag TEXT NOT NULL,
+    club TEXT NOT NULL,
+    shot TEXT NOT NULL,
+    metric TEXT NOT NULL,
+    value REAL NOT NULL,
+    count INTEGER NOT NULL,
+    PRIMARY KEY (bag, club, shot, metric, value)
+);
+CREATE TABLE IF NOT EXISTS club_sketches (
+    bag TEXT NOT NULL,
+    club TEXT NOT NULL,
+    metric TEXT NOT NULL,
+    bin INTEGER NOT NULL,
+    count INTEGER NOT NULL,
+    PRIMARY KEY (bag, club, metric, bin)
+);
+"""
+
+UPSERT_STATS = """
+INSERT INTO club_stats VALUES (?, ?, ?, ?, ?, ?)
+ON CONFLICT (bag, club, shot) DO UPDATE SET
+    count = count + excluded.count,
+    sum_offline = sum_offline + excluded.sum_offline,
+    sum_roll = sum_roll + excluded.sum_roll
+"""
+
+UPSERT_SKETCH = """
+INSERT INTO club_sketches VALUES (?, ?, ?, ?, ?)
+ON CONFLICT (bag, club, metric, bin) DO UPDATE SET
+    count = count + excluded.count
+"""
+
+UPSERT_HISTOGRAM = """
+INSERT INTO club_histograms VALUES (?, ?, ?, ?, ?, ?)
+ON CONFLICT (bag, club, shot, metric, value) DO UPDATE SET
+    count = count + excluded.count
+"""
+
+
+def session_ids(shots: pd.DataFrame) -> pd.Series:
+    """One session per date and range of a Topgolf export."""
+    if "Date" not in shots.columns:
+        raise ValueError("Shots without a Date column need an explicit session")
+    session = pd.to_datetime(shots["Date"]).dt.strftime("%Y-%m-%d")
+    if "Range" in shots.columns:
+        session = session + " " + shots["Range"].astype(str)
+    return session
+
+
+def _median(values, counts):
+    total = counts.sum()
+    cumulative = np.cumsum(counts)
+    lower = values[np.searchsorted(cumulative, (total - 1) // 2, side="right")]
+    upper = values[np.searchsorted(cumulative, total // 2, side="right")]
+    return (lower + upper) / 2
+
+
+class ShotStore:
+    """Sessions of shots per bag, with per-club aggregates kept up to date.
+
+    Imports only append: a session already in the store is skipped. New
+    shots are classified once on import, and their counts, sums and value
+    histograms are added to the per-club aggregates. Reading the stats of
+    a bag never scans its shots. Neither does reading the quantile sketches
+    its limits are calibrated on, which imports update the same way.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        with closing(self._connect()) as conn, conn:
+            conn.executescript(SCHEMA)
+            (sketched,) = conn.execute("SELECT COUNT(*) FROM club_sketches").fetchone()
+            if not sketched:
+                # Store created before the sketches, scanned once
+                shots = pd.read_sql_query("SELECT * FROM shots", conn)
+                self._sketch(conn, shots)
+
+    def _connect(self):
+        return sqlite3.connect(self.path)
+
+    def bags(self) -> list:
+        with closing(self._connect()) as conn:
+            rows = conn.execute(
+                "SELECT bag FROM sessions GROUP BY bag ORDER BY MIN(rowid)"
+            ).fetchall()
+        return [bag for bag, in rows]
+
+    def sessions(self, bag) -> pd.DataFrame:
+        with closing(self._connect()) as conn:
+            return pd.read_sql_query(
+                "SELECT * FROM sessions WHERE bag = ? ORDER BY rowid",
+                conn,
+                params=[bag],
+            )
+
+    def version(self, bag) -> str:
+        # Not the limits, which change every session on each reclassify
+        sessions = self.sessions(bag)[["bag", "session", "imported_at", "shots"]]
+        return hashlib.sha1(sessions.to_csv(index=False).encode()).hexdigest()[:16]
+
+    def limits_versions(self, bag=None) -> set:
+        """Versions of the limits the sessions, or bag's, are classified with."""
+        where, params = ("", []) if bag is None else (" WHERE bag = ?", [bag])
+        with closing(self._connect()) as conn:
+            rows = conn.execute(
+                f"SELECT DISTINCT limits FROM sessions{where}", params
+            ).fetchall()
+        return {limits for limits, in rows}
+
+    def import_shots(self, bag, shots, shot_limit, session=None) -> dict:
+        """Append the sessions of shots not in the store yet.
+
+        Returns the number of shots imported per new session.
+        """
+        shots = shots.reset_index(drop=True)
+        sessions = (
+            pd.Series(session, index=shots.index)
+            if session is not None
+            else session_ids(shots)
+        )
+        known = set(self.sessions(bag)["session"])
+        new = ~sessions.isin(known)
+        if not new.any():
+            return {}
+
+        shots = shots.loc[new, ["Club", *METRICS]].copy()
+        shots["Club"] = shots["Club"].map(club_value)
+        shots["Offset"] = shots["Offline"] - shots["Curve"]
+        shots["Shot"] = shot_types(shots, shot_limit)
+        shots.insert(0, "session", sessions[new])
+        shots.insert(0, "bag", bag)
+
+        imported_at = datetime.now(timezone.utc).isoformat()
+        version = limits_version(shot_limit)
+        counts = shots.groupby("session", sort=False).size()
+        with closing(self._connect()) as conn, conn:
+            conn.executemany(
+                "INSERT INTO sessions VALUES (?, ?, ?, ?, ?)",
+                [
+                    (bag, name, imported_at, int(count), version)
+                    for name, count in counts.items()
+                ],
+            )
+            self._append(conn, shots)
+            self._sketch(conn, shots)
+        return counts.to_dict()
+
+    def _sketch(self, conn, shots):
+        for bag, bag_shots in shots.groupby("bag", sort=False):
+            counts = sketch_counts(bag_shots.assign(Club=bag_shots["Club"].astype(str)))
+            conn.executemany(
+                UPSERT_SKETCH,
+                [
+                    (bag, club, metric, int(bin_), int(count))
+                    for (club, metric, bin_), count in counts.items()
+                ],
+            )
+
+    def _append(self, conn, shots):
+        rows = shots.drop(columns="Offset").assign(Club=shots["Club"].astype(str))
+        rows.to_sql("shots", conn, if_exists="append", index=False)
+        self._aggregate(conn, rows)
+
+    def _aggregate(self, conn, rows):
+        """Add the shots of rows, clubs as stored, to the aggregates."""
+        rows["Roll"] = rows["Total Distance"] - rows["Flat Carry"]
+        grouped = rows.groupby(["bag", "Club", "Shot"], sort=False, observed=True)
+        stats = grouped.agg(
+            count=("Shot", "size"),
+            sum_offline=("Offline", "sum"),
+            sum_roll=("Roll", "sum"),
+        )
+        conn.executemany(
+            UPSERT_STATS,
+            [
+                (*key, int(count), float(offline), float(roll))
+                for key, (count, offline, roll) in zip(
+                    stats.index, stats.itertuples(index=False)
+                )
+            ],
+        )
+
+        for metric in MEDIANS:
+            histogram = rows.groupby(
+                ["bag", "Club", "Shot", metric], sort=False, observed=True
+            ).size()
+            conn.executemany(
+                UPSERT_HISTOGRAM,
+                [
+                    (bag, club, shot, metric, float(value), int(count))
+                    for (bag, club, shot, value), count in histogram.items()
+                ],
+            )
+
+    def shots(self, bag) -> pd.DataFrame:
+        with closing(self._connect()) as conn:
+            shots = pd.read_sql_query(
+                'SELECT "Club", {}, "Shot" FROM shots WHERE bag = ? ORDER BY rowid'.format(
+                    ", ".join(f'"{metric}"' for metric in METRICS)
+                ),
+                conn,
+                params=[bag],
+            )
+        shots["Club"] = shots["Club"].map(club_value).astype(object)
+        return shots.assign(
+            Offset=shots["Offline"] - shots["Curve"],
+            Roll=shots["Total Distance"] - shots["Flat Carry"],
+        )
+
+    def club_stats(self, bag) -> pd.DataFrame:
+        """Same table as figures.club_stats, read from the aggregates."""
+        with closing(self._connect()) as conn:
+            sums = pd.read_sql_query(
+                "SELECT club, shot, count, sum_offline, sum_roll FROM club_stats"
+                " WHERE bag = ? ORDER BY rowid",
+                conn,
+                params=[bag],
+            )
+            histograms = pd.read_sql_query(
+                "SELECT club, shot, metric, value, count FROM club_histograms"
+                " WHERE bag = ? ORDER BY club, shot, metric, value",
+                conn,
+                params=[bag],
+            )
+
+        sums["club"] = sums["club"].map(club_value).astype(object)
+        histograms["club"] = histograms["club"].map(club_value).astype(object)
+        stats = pd.DataFrame(
+            {
+                "Count": sums["count"].to_numpy(),
+                "Median Carry": np.nan,
+                "Median Offline": np.nan,
+                "Mean Offline": (sums["sum_offline"] / sums["count"]).to_numpy(),
+                "Mean Roll": (sums["sum_roll"] / sums["count"]).to_numpy(),
+                "Median Total": np.nan,
+            },
+            index=pd.MultiIndex.from_frame(
+                sums[["club", "shot"]], names=["Club", "Shot"]
+            ),
+        )
+
+        for (club, shot, metric), group in histograms.groupby(
+            ["club", "shot", "metric"], sort=False
+        ):
+            stats.loc[(club, shot), MEDIANS[metric]] = _median(
+                group["value"].to_numpy(), group["count"].to_numpy()
+            )
+
+        stats["Pct"] = stats["Count"] / stats.groupby(level="Club")["Count"].transform(
+            "sum"
+        )
+        return stats
+
+    def sketches(self, bag) -> dict:
+        """{club: {metric: QuantileSketch}} of every shot of the bag."""
+        with closing(self._connect()) as conn:
+            counts = pd.read_sql_query(
+                "SELECT club, metric, bin, count FROM club_sketches WHERE bag = ?",
+                conn,
+                params=[bag],
+            )
+        counts["club"] = counts["club"].map(club_value).astype(object)
+        return club_sketches(
+            counts.set_index(["club", "metric", "bin"])["count"].rename_axis(
+                ["Club", "metric", "bin"]
+            )
+        )
+
+    def reclassify(self, shot_limit, clubs=None, bag=None):
+        """Classify the stored shots again and rebuild their aggregates.
+
+        Only the shots of bag, and of clubs, are touched when given, every
+        shot if not.
+        """
+        version = limits_version(shot_limit)
+        bag_where, bag_params = ("", []) if bag is None else (" AND bag = ?", [bag])
+        shots_where = stats_where = ""
+        params = []
+        if clubs is not None:
+            marks = ", ".join("?" * len(clubs))
+            shots_where = f' AND "Club" IN ({marks})'
+            stats_where = f" AND club IN ({marks})"
+            params = [str(club) for club in clubs]
+        shots_where = f" WHERE 1{bag_where}{shots_where}"
+        stats_where = f" WHERE 1{bag_where}{stats_where}"
+        params = bag_params + params
+
+        with closing(self._connect()) as conn, conn:
+            shots = pd.read_sql_query(
+                f"SELECT rowid, * FROM shots{shots_where} ORDER BY rowid",
+                conn,
+                params=params,
+            )
+            clubs = shots["Club"].map(club_value).astype(object)
+            shots["Shot"] = shot_types(
+                shots.assign(Club=clubs, Offset=shots["Offline"] - shots["Curve"]),
+                shot_limit,
+            )
+
+            # Updated in place, the shots keep their order
+            conn.executemany(
+                'UPDATE shots SET "Shot" = ? WHERE rowid = ?',
+                zip(shots["Shot"].astype(str), shots["rowid"].tolist()),
+            )
+            conn.execute(f"DELETE FROM club_stats{stats_where}", params)
+            conn.execute(f"DELETE FROM club_histograms{stats_where}", params)
+            conn.execute(
+                f"UPDATE sessions SET limits = ? WHERE 1{bag_where}",
+                [version, *bag_params],
+            )
+            self._aggregate(conn, shots.drop(columns="rowid"))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("store", help="SQLite file, created if missing")
+    parser.add_argument(
+        "--limits",
+        default=LIMITS_PATH,
+        help="limits file, TOPYARDAGE_LIMITS by default, built-in limits when missing",
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    single = commands.add_parser("import", help="import one Topgolf export")
+    single.add_argument("bag")
+    single.add_argument("export", help="CSV or Excel export")
+    single.add_argument("--sheet", default=0, help="sheet of an Excel export")
+    single.add_argument("--session", help="session id, by default date and range")
+
+    workbook = commands.add_parser(
+        "import-workbook", help="import every sheet of a workbook as a bag"
+    )
+    workbook.add_argument("workbook")
+    args = parser.parse_args(argv)
+
+    store = ShotStore(args.store)
+    if args.command == "import":
+        if args.export.endswith(".csv"):
+            shots = pd.read_csv(args.export)
+        else:
+            shots = pd.read_excel(args.export, sheet_name=args.sheet)
+        exports = {args.bag: shots}
+    else:
+        exports = pd.read_excel(args.workbook, sheet_name=None)
+
+    for bag, shots in exports.items():
+        # Classified as the app will, or it reclassifies the bag on start
+        shot_limit = (
+            load_limits(args.limits, bag) if args.limits else MANUAL_SHOT_LIMITS
+        )
+        imported = store.import_shots(
+            bag, shots, shot_limit, session=getattr(args, "session", None)
+        )
+        print(f"{bag}: {sum(imported.values())} shots in {len(imported)} new sessions")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,193 @@
+"""Monte Carlo approach shots resampled from a club's own shots.
+
+python simulate.py "data/Golf Range.xlsx" --bag PdH --club 7 --target 140
+python simulate.py shots.db --bag PdH --club 7 --target 140 --shots 10000000
+"""
+
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+from typing import NamedTuple
+
+import numpy as np
+import pandas as pd
+
+from calibration import QuantileSketch
+from figures import derive_columns
+from graph_helpers import MANUAL_SHOT_LIMITS, club_value
+from ingest import load_bags
+from limits import load_limits
+from shot_store import ShotStore
+
+# Radius in metres of the green drawn around the target by basic_shapes
+GREEN_RADIUS = 15
+
+# Joint distribution resampled for each simulated shot
+COLUMNS = ["Offline", "Flat Carry", "Roll"]
+
+# Simulated shots drawn at once, bounds the memory of a batch
+BATCH_SIZE = 1_000_000
+
+# Metres to the target the miss distance percentiles are kept to
+RESOLUTION = 0.1
+
+
+class Simulation(NamedTuple):
+    shots: int
+    target: float
+    # Shares of the shots landing, and finishing after the roll, on the green
+    lands_on_green: float
+    on_green: float
+    # Shares finishing beyond each edge of the green, corners count twice
+    short: float
+    long: float
+    left: float
+    right: float
+    mean_offline: float
+    sd_offline: float
+    # Finish distance minus target
+    mean_error: float
+    sd_error: float
+    # Distance from the target the shots finish within, by percentile
+    miss_distance: dict
+
+
+def club_shots(shots: pd.DataFrame, club, exclude=()) -> np.ndarray:
+    """(shots, COLUMNS) of a club, leaving out the shot types in exclude."""
+    shots = shots[(shots["Club"] == club) & ~shots["Shot"].isin(exclude)]
+    return shots[COLUMNS].dropna().to_numpy(dtype="float64")
+
+
+def kernel_scale(samples: np.ndarray) -> np.ndarray:
+    """Matrix turning standard normal noise into the smoothing kernel's.
+
+    Gaussian kernel of the samples' covariance scaled by Silverman's rule,
+    so resampled shots are not limited to the values played.
+    """
+    n, d = samples.shape
+    bandwidth = (4 / (d + 2)) ** (1 / (d + 4)) * n ** (-1 / (d + 4))
+    values, vectors = np.linalg.eigh(np.cov(samples, rowvar=False))
+    # Square root that survives a singular covariance, e.g. no roll at all
+    return bandwidth * vectors * np.sqrt(np.clip(values, 0, None))
+
+
+def _simulate_batch(samples, target, size, seed, scale):
+    rng = np.random.default_rng(seed)
+    shots = samples[rng.integers(len(samples), size=size)]
+    if scale is not None:
+        shots += rng.standard_normal((size, len(COLUMNS))) @ scale.T
+
+    offline = shots[:, 0]
+    carry = shots[:, 1] - target
+    error = carry + shots[:, 2]
+    miss = np.hypot(offline, error)
+    return {
+        "shots": size,
+        "lands_on_green": np.count_nonzero(np.hypot(offline, carry) <= GREEN_RADIUS),
+        "on_green": np.count_nonzero(miss <= GREEN_RADIUS),
+        "short": np.count_nonzero(error < -GREEN_RADIUS),
+        "long": np.count_nonzero(error > GREEN_RADIUS),
+        "left": np.count_nonzero(offline < -GREEN_RADIUS),
+        "right": np.count_nonzero(offline > GREEN_RADIUS),
+        "offline": offline.sum(),
+        "offline_squared": np.square(offline).sum(),
+        "error": error.sum(),
+        "error_squared": np.square(error).sum(),
+        "miss": QuantileSketch(resolution=RESOLUTION).update(miss),
+    }
+
+
+def _sd(total, squared, n):
+    return float(np.sqrt(max(squared / n - (total / n) ** 2, 0)))
+
+
+def simulate(
+    samples: np.ndarray,
+    target: float,
+    shots=BATCH_SIZE,
+    seed=None,
+    processes=1,
+    smooth=True,
+    batch_size=BATCH_SIZE,
+) -> Simulation:
+    """Simulation of shots approach shots to a green target metres away.
+
+    samples are a club's club_shots. Shots are drawn in batches of
+    batch_size, each from its own child of SeedSequence(seed), so a seed
+    gives the same result whatever the processes. Batches run in a pool of
+    processes, default one per core with None, when there are several.
+    """
+    if not len(samples):
+        raise ValueError("No shots to simulate from")
+    sizes = [batch_size] * (shots // batch_size)
+    if shots % batch_size:
+        sizes.append(shots % batch_size)
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    scale = kernel_scale(samples) if smooth and len(samples) > 1 else None
+    args = [(samples, target, size, child, scale) for size, child in zip(sizes, seeds)]
+
+    if len(args) > 1 and processes != 1:
+        with ProcessPoolExecutor(max_workers=processes) as pool:
+            batches = list(pool.map(_simulate_batch, *zip(*args)))
+    else:
+        batches = [_simulate_batch(*batch) for batch in args]
+
+    totals = {
+        key: sum(batch[key] for batch in batches) for key in batches[0] if key != "miss"
+    }
+    miss = QuantileSketch(resolution=RESOLUTION)
+    for batch in batches:
+        miss.merge(batch["miss"])
+
+    n = totals["shots"]
+    return Simulation(
+        shots=n,
+        target=target,
+        lands_on_green=float(totals["lands_on_green"] / n),
+        on_green=float(totals["on_green"] / n),
+        short=float(totals["short"] / n),
+        long=float(totals["long"] / n),
+        left=float(totals["left"] / n),
+        right=float(totals["right"] / n),
+        mean_offline=float(totals["offline"] / n),
+        sd_offline=_sd(totals["offline"], totals["offline_squared"], n),
+        mean_error=float(totals["error"] / n),
+        sd_error=_sd(totals["error"], totals["error_squared"], n),
+        miss_distance={
+            p: round(float(miss.quantile(p / 100)), 1) for p in (50, 75, 90)
+        },
+    )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("source", help="shot store, or workbook or data directory")
+    parser.add_argument("--bag", required=True)
+    parser.add_argument("--club", required=True, type=club_value)
+    parser.add_argument("--target", required=True, type=float, help="metres")
+    parser.add_argument("--shots", type=int, default=BATCH_SIZE)
+    parser.add_argument("--seed", type=int)
+    parser.add_argument("--processes", type=int, default=1, help="0 for one per core")
+    parser.add_argument("--limits", help="limits file, built-in limits when missing")
+    args = parser.parse_args(argv)
+
+    if args.source.endswith(".db"):
+        shots = ShotStore(args.source).shots(args.bag)
+    else:
+        shot_limit = (
+            load_limits(args.limits, args.bag) if args.limits else MANUAL_SHOT_LIMITS
+        )
+        shots = derive_columns(load_bags(args.source)[args.bag], shot_limit)
+
+    result = simulate(
+        club_shots(shots, args.club),
+        args.target,
+        args.shots,
+        args.seed,
+        args.processes or None,
+    )
+    for field, value in result._asdict().items():
+        print(f"{field:<15} {value}")
+
+
+if __name__ == "__main__":
+    main()
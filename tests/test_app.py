@@ -0,0 +1,155 @@
+import copy
+import gzip
+import json
+
+import pytest
+
+import app
+import responses
+from dataset import build_snapshot
+from graph_helpers import MANUAL_SHOT_LIMITS
+from ingest import load_bags
+from recommend import ClubIndex
+
+
+@pytest.fixture
+def client():
+    return app.server.test_client()
+
+
+@pytest.fixture
+def edit_limits():
+    """Publishes a snapshot with new limits for the 7, the original after."""
+    original = app.DATA.current()
+
+    def publish():
+        shot_limit = copy.deepcopy(MANUAL_SHOT_LIMITS)
+        shot_limit[7]["Offline"] -= 3
+        frames = load_bags(app.DATA_PATH)
+        app.DATA.publish(build_snapshot(frames, shot_limit, original))
+
+    yield publish
+    app.DATA.publish(original)
+
+
+def etag(client, path, **headers):
+    response = client.get(path, headers=headers)
+    assert response.status_code == 200
+    return response.headers["ETag"]
+
+
+def strict_json(response):
+    def reject(constant):
+        raise ValueError(f"{constant} is not JSON")
+
+    return json.loads(response.data, parse_constant=reject)
+
+
+def test_recommend(client):
+    response = client.get("/api/recommend?bag=PdH&target=140&target=95.5")
+
+    assert response.status_code == 200
+    body = strict_json(response)
+    assert [row["target"] for row in body["recommendations"]] == [140, 95.5]
+    assert all(0 <= row["probability"] <= 1 for row in body["recommendations"])
+
+
+@pytest.mark.parametrize(
+    "query",
+    [
+        "target=nan",
+        "target=inf",
+        "target=140&target=-inf",
+        "target=140&tolerance=nan",
+        "target=140&tolerance=inf",
+        "target=140&tolerance=-5",
+        "target=140&tolerance=0",
+        "target=140&metric=roll",
+        "tolerance=5",
+    ],
+)
+def test_recommend_rejects(client, query):
+    response = client.get(f"/api/recommend?bag=PdH&{query}")
+
+    assert response.status_code == 400
+    strict_json(response)
+
+
+def test_recommend_unknown_bag(client):
+    assert client.get("/api/recommend?bag=nobody&target=140").status_code == 404
+
+
+def test_recommend_without_shots(client, monkeypatch):
+    monkeypatch.setattr(
+        app.INDEX_CACHE, "get_or_build", lambda key, build: ClubIndex({})
+    )
+
+    response = client.get("/api/recommend?bag=PdH&target=140")
+
+    assert response.status_code == 404
+    assert "error" in strict_json(response)
+
+
+def test_figure_conditional_get(client):
+    response = client.get("/figure/PdH")
+    tag = response.headers["ETag"]
+
+    assert response.status_code == 200
+    assert strict_json(response)["data"]
+
+    revalidated = client.get("/figure/PdH", headers={"If-None-Match": tag})
+    assert revalidated.status_code == 304
+    assert revalidated.data == b""
+    assert revalidated.headers["ETag"] == tag
+
+    stale = client.get("/figure/PdH", headers={"If-None-Match": '"stale"'})
+    assert stale.status_code == 200
+
+
+def test_figure_conditional_get_gzip(client):
+    identity = client.get("/figure/PdH?club=7")
+    response = client.get("/figure/PdH?club=7", headers={"Accept-Encoding": "gzip"})
+    tag = response.headers["ETag"]
+
+    assert response.headers["Content-Encoding"] == "gzip"
+    assert tag != identity.headers["ETag"]
+    assert gzip.decompress(response.data) == identity.data
+
+    revalidated = client.get(
+        "/figure/PdH?club=7",
+        headers={"Accept-Encoding": "gzip", "If-None-Match": tag},
+    )
+    assert revalidated.status_code == 304
+
+
+def test_figure_etag_follows_limits(client, edit_limits):
+    paths = ["/figure/PdH", "/figure/PdH?club=7", "/figure/PdH?club=8"]
+    before = {path: etag(client, path) for path in paths}
+
+    edit_limits()
+    after = {path: etag(client, path) for path in paths}
+
+    assert after["/figure/PdH"] != before["/figure/PdH"]
+    assert after["/figure/PdH?club=7"] != before["/figure/PdH?club=7"]
+    assert after["/figure/PdH?club=8"] == before["/figure/PdH?club=8"]
+    response = client.get(
+        "/figure/PdH?club=7", headers={"If-None-Match": before["/figure/PdH?club=7"]}
+    )
+    assert response.status_code == 200
+
+
+def test_figure_etag_follows_code(client, monkeypatch):
+    tag = etag(client, "/figure/PdH")
+
+    monkeypatch.setattr(responses, "build_version", lambda: "other build")
+
+    assert etag(client, "/figure/PdH") != tag
+    response = client.get("/figure/PdH", headers={"If-None-Match": tag})
+    assert response.status_code == 200
+
+
+@pytest.mark.parametrize(
+    "path", ["/figure/nobody", "/figure/nobody?club=7", "/figure/PdH?club=Putter"]
+)
+def test_figure_not_found(client, path):
+    assert client.get(path).status_code == 404
@@ -0,0 +1,65 @@
+import math
+
+import numpy as np
+import pandas as pd
+
+from calibration import (
+    QuantileSketch,
+    calibrate,
+    club_sketches,
+    merge_sketches,
+    sketch_counts,
+)
+from graph_helpers import MANUAL_SHOT_LIMITS
+
+
+def test_quantile_empty():
+    assert math.isnan(QuantileSketch().quantile(0.5))
+    assert math.isnan(
+        merge_sketches({7: {"Curve": QuantileSketch()}})[7]["Curve"].quantile(0.5)
+    )
+
+
+def test_quantile_matches_percentile():
+    values = np.random.default_rng(0).integers(0, 200, 1000)
+    sketch = QuantileSketch(resolution=1).update(values)
+
+    for q in (0, 0.2, 0.5, 0.9, 1):
+        assert sketch.quantile(q) == np.percentile(values, q * 100, method="lower")
+
+
+def shots(club, n, **metrics):
+    rng = np.random.default_rng(1)
+    df = pd.DataFrame(
+        {
+            "Club": [club] * n,
+            **{
+                metric: rng.uniform(10, 60, n)
+                for metric in ("Ball Speed", "Launch Angle", "Height", "Curve")
+            },
+            "Offline": rng.uniform(-20, 20, n),
+        }
+    )
+    return df.assign(**metrics)
+
+
+def test_calibrate_falls_back_per_metric():
+    sketches = club_sketches(
+        sketch_counts(pd.concat([shots(7, 50, Curve=np.nan), shots(8, 50)]))
+    )
+
+    limits = calibrate(sketches, min_shots=30)
+
+    # Curve, and Offset derived from it, have no values for the 7
+    for field in ("Straight", "Curve", "Offset"):
+        assert limits[7][field] == MANUAL_SHOT_LIMITS[7][field]
+    assert limits[7]["Ball Speed"] != MANUAL_SHOT_LIMITS[7]["Ball Speed"]
+    assert limits[7]["Offline"] == round(sketches[7]["Offline"].quantile(0.5))
+    assert limits[8]["Curve"] == round(sketches[8]["Curve"].quantile(0.5))
+
+
+def test_calibrate_without_fallback():
+    sketches = club_sketches(sketch_counts(shots(7, 50, Height=np.nan)))
+
+    assert 7 not in calibrate(sketches, fallback={}, min_shots=30)
+    assert calibrate(sketches, fallback={}, min_shots=60) == {}
@@ -0,0 +1,85 @@
+import copy
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+from dataset import build_snapshot, build_store_snapshot
+from graph_helpers import MANUAL_SHOT_LIMITS
+from ingest import load_bags
+from shot_store import ShotStore
+
+WORKBOOK = Path(__file__).parent.parent / "data" / "Golf Range.xlsx"
+
+EDITED_CLUB = 7
+
+
+@pytest.fixture(scope="module")
+def frames():
+    return load_bags(WORKBOOK)
+
+
+@pytest.fixture
+def edited():
+    shot_limit = copy.deepcopy(MANUAL_SHOT_LIMITS)
+    shot_limit[EDITED_CLUB]["Curve"] -= 2
+    shot_limit[EDITED_CLUB]["Offline"] -= 3
+    return shot_limit
+
+
+def assert_same_bags(incremental, full):
+    assert list(incremental.bags) == list(full.bags)
+    for golf_bag, bag in incremental.bags.items():
+        expected = full.bags[golf_bag]
+        pd.testing.assert_frame_equal(bag.shots, expected.shots)
+        pd.testing.assert_frame_equal(
+            bag.stats.sort_index(), expected.stats.sort_index()
+        )
+        assert bag.good.keys() == expected.good.keys()
+        for club, good in bag.good.items():
+            pd.testing.assert_frame_equal(good, expected.good[club])
+        assert bag.clubs == expected.clubs
+
+
+def test_reclassify_matches_full_build(frames, edited):
+    previous = build_snapshot(frames, MANUAL_SHOT_LIMITS)
+
+    incremental = build_snapshot(frames, edited, previous)
+    full = build_snapshot(frames, edited)
+
+    assert_same_bags(incremental, full)
+    assert incremental.version == full.version
+    assert incremental.data_versions == previous.data_versions
+    for golf_bag, bag in full.bags.items():
+        assert incremental.versions(golf_bag) == full.versions(golf_bag)
+        assert incremental.versions(golf_bag) != previous.versions(golf_bag)
+        for club in bag.clubs:
+            assert incremental.versions(golf_bag, club) == full.versions(golf_bag, club)
+            assert (
+                incremental.versions(golf_bag, club)
+                == previous.versions(golf_bag, club)
+            ) == (club != EDITED_CLUB)
+
+
+def test_store_reclassify_matches_full_import(frames, edited, tmp_path):
+    store = ShotStore(tmp_path / "shots.db")
+    fresh = ShotStore(tmp_path / "fresh.db")
+    for golf_bag, df in frames.items():
+        store.import_shots(golf_bag, df, MANUAL_SHOT_LIMITS, session="range")
+        fresh.import_shots(golf_bag, df, edited, session="range")
+    previous = build_store_snapshot(store, MANUAL_SHOT_LIMITS)
+
+    incremental = build_store_snapshot(store, edited, previous)
+    full = build_store_snapshot(fresh, edited)
+
+    assert_same_bags(incremental, full)
+    assert store.limits_versions() == fresh.limits_versions()
+    # The import times differ between the stores, not between the snapshots
+    assert incremental.data_versions == previous.data_versions
+    for golf_bag, bag in full.bags.items():
+        for club in bag.clubs:
+            limits = incremental.versions(golf_bag, club)[1]
+            assert limits == full.versions(golf_bag, club)[1]
+            assert (limits == previous.versions(golf_bag, club)[1]) == (
+                club != EDITED_CLUB
+            )
@@ -0,0 +1,85 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from graph_helpers import (
+    CLUB_DTYPE,
+    CLUB_ORDER,
+    MANUAL_SHOT_LIMITS,
+    shot_type,
+    shot_types,
+)
+
+SHOTS_PER_CLUB = 500
+
+
+def random_shots(seed, nan_share=0.1):
+    """Shots of every club in CLUB_ORDER spread around its limits.
+
+    Part of the metrics sit exactly on a limit, part are NaN.
+    """
+    rng = np.random.default_rng(seed)
+    frames = []
+    for club in CLUB_ORDER:
+        limit = MANUAL_SHOT_LIMITS[club]
+        ball_speed = limit["Ball Speed"]
+        launch, height = limit["Launch Angle"], limit["Height"]
+        curve, offset, offline = limit["Curve"], limit["Offset"], limit["Offline"]
+        spreads = {
+            "Ball Speed": (
+                ball_speed - 5,
+                ball_speed + 5,
+                [ball_speed, ball_speed - 2],
+            ),
+            "Launch Angle": (launch[0] - 3, launch[1] + 3, list(launch)),
+            "Height": (height[0] - 3, height[1] + 3, list(height)),
+            "Curve": (-2 * curve, 2 * curve, [-curve, curve, limit["Straight"]]),
+            "Offset": (-2 * offset, 2 * offset, [-offset, offset]),
+            "Offline": (-2 * offline, 2 * offline, [-offline, offline]),
+        }
+        frame = {"Club": [club] * SHOTS_PER_CLUB}
+        for metric, (low, high, edges) in spreads.items():
+            values = rng.uniform(low, high, SHOTS_PER_CLUB)
+            on_edge = rng.random(SHOTS_PER_CLUB) < 0.1
+            values[on_edge] = rng.choice(edges, on_edge.sum())
+            values[rng.random(SHOTS_PER_CLUB) < nan_share] = np.nan
+            frame[metric] = values
+        frames.append(pd.DataFrame(frame))
+    return pd.concat(frames, ignore_index=True)
+
+
+def row_wise(shots):
+    return shots.apply(lambda shot: shot_type(shot, MANUAL_SHOT_LIMITS), axis=1)
+
+
+@pytest.mark.parametrize("seed", [0, 1, 2])
+def test_shot_types_matches_shot_type(seed):
+    shots = random_shots(seed)
+
+    expected = row_wise(shots)
+
+    assert shots["Club"].isin(CLUB_ORDER).all()
+    assert expected.nunique() > 10
+    assert shot_types(shots, MANUAL_SHOT_LIMITS).tolist() == expected.tolist()
+
+
+def test_shot_types_categorical_clubs():
+    shots = random_shots(3)
+    categorical = shots.astype({"Club": CLUB_DTYPE})
+
+    assert (
+        shot_types(categorical, MANUAL_SHOT_LIMITS).tolist() == row_wise(shots).tolist()
+    )
+
+
+def test_shot_types_all_nan_metrics():
+    shots = random_shots(4, nan_share=1)
+
+    assert shot_types(shots, MANUAL_SHOT_LIMITS).tolist() == row_wise(shots).tolist()
+
+
+def test_shot_types_unknown_club():
+    shots = random_shots(5).head(1).assign(Club="Putter")
+
+    with pytest.raises(KeyError):
+        shot_types(shots, MANUAL_SHOT_LIMITS)
@@ -0,0 +1,44 @@
+import shutil
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from dataset import build_snapshot
+from graph_helpers import MANUAL_SHOT_LIMITS
+from ingest import REQUIRED_COLUMNS, load_bags
+
+WORKBOOK = Path(__file__).parent.parent / "data" / "Golf Range.xlsx"
+
+
+def shots(clubs):
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame(
+        rng.uniform(10, 100, (len(clubs), len(REQUIRED_COLUMNS) - 1)),
+        columns=REQUIRED_COLUMNS[1:],
+    )
+    df.insert(0, "Club", clubs)
+    return df
+
+
+def test_unknown_clubs_only_skip_their_shots(tmp_path, caplog):
+    shutil.copy(WORKBOOK, tmp_path / "alice.xlsx")
+    with pd.ExcelWriter(tmp_path / "bob.xlsx") as writer:
+        shots(["Driver", "Hybrid", None, 7]).to_excel(
+            writer, sheet_name="Mixed", index=False
+        )
+        shots(["Hybrid", "Hybrid"]).to_excel(writer, sheet_name="Hybrid", index=False)
+
+    bags = load_bags(tmp_path, processes=1)
+
+    alice = load_bags(WORKBOOK)
+    assert [bag for bag in bags if bag.startswith("alice/")] == [
+        f"alice/{sheet}" for sheet in alice
+    ]
+    assert "bob/Hybrid" not in bags
+    assert bags["bob/Mixed"]["Club"].tolist() == ["Driver", 7]
+    assert "Hybrid" in caplog.text
+
+    snapshot = build_snapshot(bags, MANUAL_SHOT_LIMITS)
+    assert list(snapshot.bags) == list(bags)
+    assert snapshot.bags["bob/Mixed"].clubs == ["Driver", 7]
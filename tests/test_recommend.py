@@ -0,0 +1,61 @@
+import numpy as np
+import pytest
+
+from recommend import ClubIndex
+
+
+def random_index(seed):
+    rng = np.random.default_rng(seed)
+    distances = {}
+    for i, club in enumerate(["Driver", 5, 7, 9, "PW"]):
+        # Whole and half metres as Topgolf reports, exact in float
+        values = rng.integers(2 * (60 + 20 * i), 2 * (100 + 20 * i), 200) / 2
+        distances[club] = {"Flat Carry": values, "Total Distance": values + 10}
+    return ClubIndex(distances)
+
+
+def brute_force(index, targets, tolerance, metric="Flat Carry"):
+    return np.array(
+        [
+            [
+                np.count_nonzero(np.abs(values - target) <= tolerance) / len(values)
+                for values in index.distances[metric]
+            ]
+            for target in targets
+        ]
+    )
+
+
+@pytest.mark.parametrize("tolerance", [0.5, 2.5, 5, 40])
+def test_probabilities_match_brute_force(tolerance):
+    index = random_index(0)
+    targets = np.arange(40, 220, 0.5)
+
+    expected = brute_force(index, targets, tolerance)
+
+    assert np.array_equal(index.probabilities(targets, tolerance), expected)
+    assert np.array_equal(
+        index.probabilities(targets, tolerance, metric="total"),
+        brute_force(index, targets, tolerance, "Total Distance"),
+    )
+
+
+def test_recommend_likeliest_club():
+    index = random_index(1)
+    targets = np.arange(40, 220, 3.5)
+
+    recommendations = index.recommend(targets, 5)
+
+    expected = brute_force(index, targets, 5)
+    assert np.array_equal(recommendations["Probability"], expected.max(axis=1))
+    chosen = [index.clubs.index(club) for club in recommendations["Club"]]
+    assert np.array_equal(
+        expected[np.arange(len(targets)), chosen], expected.max(axis=1)
+    )
+
+
+def test_recommend_without_shots():
+    with pytest.raises(ValueError):
+        ClubIndex({}).recommend([150])
+    with pytest.raises(ValueError):
+        ClubIndex({7: {"Flat Carry": [], "Total Distance": []}}).recommend([150])
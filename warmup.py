@@ -0,0 +1,91 @@
+import logging
+import threading
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import plotly.graph_objects as go
+
+from metrics import timed
+
+logger = logging.getLogger(__name__)
+
+
+def _build(build, *args):
+    # Figures are sent back as plain dicts, unpickling a Figure validates it
+    # all over again
+    result = build(*args)
+    if isinstance(result, go.Figure):
+        return True, result.to_plotly_json()
+    return False, result
+
+
+def _unpack(built):
+    is_figure, result = built
+    return go.Figure(result, _validate=False) if is_figure else result
+
+
+class Warmer:
+    """Builds every figure of a snapshot into the cache before it is asked for.
+
+    tasks(snapshot) lists the (key, build, args) of the figures, build and
+    args must pickle as they run in a process pool. start() warms up in a
+    background thread, and ready is set once every figure of the latest
+    snapshot is in the cache. A snapshot started mid-warm-up supersedes the
+    previous one.
+    """
+
+    def __init__(self, cache, tasks, processes=None):
+        self.cache = cache
+        self.tasks = tasks
+        self.processes = processes
+        self.ready = threading.Event()
+        self._latest = None
+        self._lock = threading.Lock()
+
+    def start(self, snapshot):
+        with self._lock:
+            self._latest = snapshot
+            self.ready.clear()
+        threading.Thread(
+            target=self.warm, args=(snapshot,), name="topyardage-warmup", daemon=True
+        ).start()
+
+    def warm(self, snapshot):
+        tasks = self.tasks(snapshot)
+        if len(tasks) > self.cache.maxsize:
+            logger.warning(
+                "Warming up %d figures in a cache of %d", len(tasks), self.cache.maxsize
+            )
+        tasks = [task for task in tasks if task[0] not in self.cache]
+
+        with timed("warmup"):
+            if len(tasks) > 1 and self.processes != 1:
+                self._warm_pool(snapshot, tasks)
+            else:
+                for key, build, args in tasks:
+                    if self._latest is not snapshot:
+                        return
+                    self._put(key, lambda: _unpack(_build(build, *args)))
+
+        with self._lock:
+            if self._latest is snapshot:
+                self.ready.set()
+                logger.info("Warmed up %d figures of %s", len(tasks), snapshot.version)
+
+    def _warm_pool(self, snapshot, tasks):
+        with ProcessPoolExecutor(max_workers=self.processes) as pool:
+            futures = {
+                pool.submit(_build, build, *args): key for key, build, args in tasks
+            }
+            for future in as_completed(futures):
+                if self._latest is not snapshot:
+                    for pending in futures:
+                        pending.cancel()
+                    return
+                self._put(futures[future], lambda: _unpack(future.result()))
+
+    def _put(self, key, build):
+        try:
+            self.cache.put(key, build())
+        except Exception:
+            # Built again on request
+            logger.exception("Warming up %s failed", key)